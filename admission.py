@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+SUBMIT_SAVED = 'saved'
+SUBMIT_DUPLICATE = 'duplicate'
+SUBMIT_RATE_LIMITED = 'rate_limited'
+SUBMIT_FAILED = 'failed'
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity` banked"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now=None):
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, tokens=1):
+        self.refill()
+        return self.tokens >= tokens
+
+    def take(self, tokens=1):
+        self.tokens -= tokens
+
+
+class SubmissionGate:
+    """
+    In-process admission layer in front of the review writer.
+    Applies per-session and global token buckets, drops duplicate
+    submissions by idempotency key, and coalesces submissions that arrive
+    within `batch_window` seconds into a single writer call.
+    Writes happen on a background flusher thread, so `writer` must not
+    touch the UI; a submitter only waits for the batch holding its row.
+    """
+
+    def __init__(self, writer, session_rate=0.1, session_burst=3, global_rate=10, global_burst=50,
+                 batch_window=0.1, max_batch=100, idempotency_ttl=900, max_sessions=10000):
+        self.writer = writer
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.idempotency_ttl = idempotency_ttl
+        self.max_sessions = max_sessions
+
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self._completed = OrderedDict()
+        self._inflight = {}
+        self._queue = []
+        self._flushing = False
+
+    def _session_bucket(self, session_id):
+        bucket = self._sessions.pop(session_id, None)
+        if bucket is None:
+            bucket = TokenBucket(self.session_rate, self.session_burst)
+        self._sessions[session_id] = bucket
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return bucket
+
+    def _expire_keys(self, now):
+        while self._completed:
+            key, completed_at = next(iter(self._completed.items()))
+            if now - completed_at < self.idempotency_ttl:
+                break
+            self._completed.popitem(last=False)
+
+    def submit(self, session_id, idempotency_key, row, timeout=30):
+        """Admit one submission and block until it is written; returns a SUBMIT_* status"""
+        with self._lock:
+            self._expire_keys(time.monotonic())
+
+            if idempotency_key in self._completed:
+                return SUBMIT_DUPLICATE
+
+            pending = self._inflight.get(idempotency_key)
+            if pending is None:
+                bucket = self._session_bucket(session_id)
+                if not (bucket.available() and self.global_bucket.available()):
+                    return SUBMIT_RATE_LIMITED
+                bucket.take()
+                self.global_bucket.take()
+
+                future = Future()
+                self._inflight[idempotency_key] = future
+                self._queue.append((idempotency_key, row, future))
+
+                if not self._flushing:
+                    self._flushing = True
+                    threading.Thread(target=self._flush, name='submission-flusher', daemon=True).start()
+            else:
+                future = pending
+
+        try:
+            saved = future.result(timeout=timeout)
+        except Exception:
+            saved = False
+
+        if pending is not None:
+            return SUBMIT_DUPLICATE if saved else SUBMIT_FAILED
+        return SUBMIT_SAVED if saved else SUBMIT_FAILED
+
+    def _flush(self):
+        """Flusher thread: wait one batch window, then drain the queue in batches"""
+        time.sleep(self.batch_window)
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._flushing = False
+                    return
+                batch = self._queue[:self.max_batch]
+                del self._queue[:self.max_batch]
+
+            try:
+                saved = bool(self.writer([row for _, row, _ in batch]))
+            except Exception:
+                saved = False
+
+            with self._lock:
+                now = time.monotonic()
+                for key, _, future in batch:
+                    self._inflight.pop(key, None)
+                    if saved:
+                        self._completed[key] = now
+                    future.set_result(saved)
@@ -3,49 +3,197 @@ import pandas as pd
 import plotly.graph_objects as go
 import json
 import time
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime
 from utils import (
     load_reviews, configure_gemini_api, 
-    update_review_with_ai, get_sentiment_color, get_rating_emoji,
-    get_rating_text, time_ago, safe_get_value
+    update_review_with_ai, claim_reviews, release_reviews, open_review_sheets, ReviewConflictError,
+    get_sentiment_color, get_rating_emoji,
+    prepare_review_cards, fallback_ai_content
 )
-
-def generate_tech_analysis(model, rating, review_text):
+from search_index import ReviewSearchIndex
+from rollups import ReviewRollup, window_start, GRANULARITY_FREQ
+from jobs import BatchJob, MAX_ATTEMPTS, ROW_PENDING, ROW_DONE, ROW_FAILED
+from metering import usage_meter, BudgetExceededError, BUDGET_PAUSE, BUDGET_FALLBACK
+from prompts import generate_for_task
+
+SEARCH_PAGE_SIZE = 20
+CLAIM_CHUNK_SIZE = 10
+
+@st.cache_resource
+def get_search_index():
+    """Process-wide search index, kept in sync incrementally across reruns"""
+    return ReviewSearchIndex()
+
+@st.cache_resource
+def get_review_rollup():
+    """Process-wide hourly rollup backing the metrics and charts"""
+    return ReviewRollup()
+
+def generate_tech_analysis(model, rating, review_text, run_id=None, daily_budget=None, run_budget=None):
     """
     Generates tech-focused, concise recommended actions.
     """
-    prompt = f"""
-    You are a Technical QA System. Analyze this feedback (Rating: {rating}/5):
-    "{review_text}"
-
-    1. Write a polite, short response to the user.
-    2. Provide 3 General-Purpose TECHNICAL Recommended Actions.
-       - Focus on: Code optimization, System quality, Performance, or Tech debt.
-       - CONSTRAINT: Each action must be under 10 words.
-       - Format: Action 1 | Action 2 | Action 3
-
-    Return strictly valid JSON:
-    {{
-        "ai_response": "Your response here...",
-        "recommended_actions": "Action 1 | Action 2 | Action 3"
-    }}
+    usage_meter.check_budget(run_id, daily_budget, run_budget)
+    
+    response = generate_for_task(model, 'tech_analysis', rating, review_text, run_id=run_id)
+    text_response = response.text.replace('```json', '').replace('```', '').strip()
+    data = json.loads(text_response)
+    
+    ai_response = str(data.get("ai_response", "")).strip()
+    if not ai_response:
+        raise ValueError("Empty AI response")
+    
+    return {
+        "ai_response": ai_response,
+        "ai_summary": "See Recommendations", 
+        "recommended_actions": data.get("recommended_actions", "")
+    }
+
+def generate_with_budget(model, rating, review_text, budget_mode, run_id=None, daily_budget=None, run_budget=None):
+    """
+    generate_tech_analysis, switching to the local fallback templates once the
+    budget is spent when budget_mode is BUDGET_FALLBACK (otherwise it raises).
     """
     try:
-        response = model.generate_content(prompt)
-        text_response = response.text.replace('```json', '').replace('```', '').strip()
-        data = json.loads(text_response)
+        return generate_tech_analysis(model, rating, review_text, run_id, daily_budget, run_budget)
+    except BudgetExceededError:
+        if budget_mode != BUDGET_FALLBACK:
+            raise
+        return fallback_ai_content(rating)
+
+def run_batch_job(job, api_key, budget_mode=BUDGET_PAUSE, daily_budget=None, run_budget=None):
+    """
+    Process the pending rows of a batch job, checkpointing after every row.
+    The job id doubles as the usage run id, so the per-run budget covers the
+    whole job across pauses and resumes.
+    Rows are leased in small chunks under the job's id, so concurrent jobs
+    split the pending set and a resumed job keeps its own leases; rows leased
+    by another job are skipped. Failures are recorded on the job instead of
+    being written to the sheet.
+    """
+    keys = job.pending_keys()
+    if not keys:
+        st.info("✅ Nothing left to process — failed reviews have used all their attempts")
+        return
+    
+    with st.spinner("Processing reviews..."):
+        model = configure_gemini_api(api_key)
+        if not model:
+            st.error("❌ Failed to configure Gemini API")
+            return
         
-        return {
-            "ai_response": data.get("ai_response", ""),
-            "ai_summary": "See Recommendations", 
-            "recommended_actions": data.get("recommended_actions", "")
-        }
-    except Exception as e:
-        return {
-            "ai_response": "Error generating analysis.",
-            "ai_summary": "Error",
-            "recommended_actions": "Manual review required."
-        }
+        try:
+            sheets = open_review_sheets()
+        except Exception as e:
+            st.error(f"❌ Cannot open Google Sheet: {str(e)}")
+            return
+        
+        df = load_reviews()
+        worker_id = job.job_id
+        run_id = job.job_id
+        processed_count = 0
+        failed_count = 0
+        skipped_count = 0
+        budget_stop = None
+        
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        
+        for chunk_start in range(0, len(keys), CLAIM_CHUNK_SIZE):
+            if budget_stop:
+                break
+            
+            chunk = keys[chunk_start:chunk_start + CLAIM_CHUNK_SIZE]
+            
+            for key in chunk:
+                if key not in df.index:
+                    job.mark_failed(key, "Review not found")
+                    failed_count += 1
+                elif str(df.at[key, 'ai_response']).strip():
+                    job.mark_done(key, attempted=False)
+            
+            claimable = [key for key in chunk if key in df.index and not str(df.at[key, 'ai_response']).strip()]
+            try:
+                claimed = claim_reviews(claimable, worker_id, sheets=sheets) if claimable else {}
+            except Exception as e:
+                # Quota or network errors are failures, not rows lost to another worker
+                for key in claimable:
+                    job.mark_failed(key, f"Claim failed: {e}")
+                failed_count += len(claimable)
+                continue
+            
+            for key in claimable:
+                if key not in claimed:
+                    job.mark_skipped(key, "Claimed by another worker")
+                    skipped_count += 1
+            
+            for idx, key in enumerate(claimed, start=1):
+                if budget_stop:
+                    release_reviews([key], worker_id, sheets=sheets)
+                    continue
+                
+                status_text.text(f"Processing review {chunk_start + idx} of {len(keys)}...")
+                
+                try:
+                    row = df.loc[key]
+                    ai_content = generate_with_budget(
+                        model,
+                        int(row['rating']),
+                        str(row['review']),
+                        budget_mode,
+                        run_id=run_id,
+                        daily_budget=daily_budget,
+                        run_budget=run_budget
+                    )
+                    
+                    success = update_review_with_ai(
+                        key,
+                        ai_content['ai_response'],
+                        ai_content['ai_summary'],
+                        ai_content['recommended_actions'],
+                        owner=worker_id,
+                        expected_version=claimed[key],
+                        sheets=sheets
+                    )
+                    
+                    if success:
+                        job.mark_done(key)
+                        processed_count += 1
+                    else:
+                        release_reviews([key], worker_id, sheets=sheets)
+                        job.mark_failed(key, "Sheet update failed")
+                        failed_count += 1
+                    
+                    time.sleep(0.5)
+                
+                except BudgetExceededError as e:
+                    release_reviews([key], worker_id, sheets=sheets)
+                    budget_stop = str(e)
+                except ReviewConflictError as e:
+                    job.mark_skipped(key, e)
+                    skipped_count += 1
+                except Exception as e:
+                    release_reviews([key], worker_id, sheets=sheets)
+                    job.mark_failed(key, e)
+                    failed_count += 1
+            
+            progress_bar.progress(min(chunk_start + CLAIM_CHUNK_SIZE, len(keys)) / len(keys))
+        
+        status_text.empty()
+        progress_bar.empty()
+    
+    if processed_count > 0:
+        st.success(f"✅ Successfully processed {processed_count} reviews!")
+    if skipped_count > 0:
+        st.info(f"🤝 Skipped {skipped_count} reviews handled by another admin session")
+    if failed_count > 0:
+        st.warning(f"⚠️ Failed to process {failed_count} reviews — they stay pending and can be retried")
+    if budget_stop:
+        st.warning(f"💰 {budget_stop}. Batch paused — raise the budget and click Process All Pending to resume.")
+    elif processed_count > 0:
+        time.sleep(1)
+        st.rerun()
 
 st.set_page_config(
     page_title="Admin Dashboard",
@@ -113,6 +261,7 @@ div[data-testid="metric-container"] {
     0%, 100% { opacity: 1; }
     50% { opacity: 0.6; }
 }
+mark { background: #fff59d; padding: 0 2px; border-radius: 3px; }
 .api-warning {
     background: #fff3cd; border-left: 4px solid #ffc107;
     padding: 1rem; border-radius: 8px; color: #856404; margin: 1rem 0;
@@ -131,6 +280,12 @@ st.markdown("""
 with st.sidebar:
     st.markdown("## 🤖 AI Processing")
     
+    if 'worker_id' not in st.session_state:
+        st.session_state.worker_id = uuid.uuid4().hex[:12]
+    
+    daily_budget = run_budget = None
+    budget_mode = BUDGET_PAUSE
+    
     api_key = st.text_input(
         "Gemini API Key",
         type="password",
@@ -141,70 +296,65 @@ with st.sidebar:
     if api_key:
         st.success("✅ API Key Connected")
         
+        with st.expander("💰 AI Budget"):
+            daily_budget = st.number_input(
+                "Daily budget (USD, 0 = unlimited)", min_value=0.0,
+                value=float(st.secrets.get("AI_DAILY_BUDGET_USD", 0.0)), step=0.5
+            )
+            run_budget = st.number_input(
+                "Per-run budget (USD, 0 = unlimited)", min_value=0.0,
+                value=float(st.secrets.get("AI_RUN_BUDGET_USD", 0.0)), step=0.1
+            )
+            budget_mode = st.radio(
+                "When the budget is reached",
+                [BUDGET_PAUSE, BUDGET_FALLBACK],
+                format_func=lambda x: "⏸️ Pause batch" if x == BUDGET_PAUSE else "📝 Use fallback templates"
+            )
+        
+        batch_job = BatchJob.latest()
+        run_job = None
+        
+        if batch_job is not None and batch_job.is_locked():
+            st.info(f"🤝 Run {batch_job.job_id} is in progress in another admin session; a new run splits the remaining reviews with it")
+            batch_job = None
+        elif batch_job is not None and not batch_job.is_finished:
+            job_counts = batch_job.counts()
+            st.info(f"⏸️ Run {batch_job.job_id} was interrupted: {job_counts[ROW_DONE]} done, {job_counts[ROW_PENDING]} pending, {job_counts[ROW_FAILED]} failed")
+        
         if st.button("🚀 Process All Pending", use_container_width=True, type="primary"):
-            with st.spinner("Processing reviews..."):
-                model = configure_gemini_api(api_key)
+            if batch_job is not None and not batch_job.is_finished:
+                run_job = batch_job
+            else:
+                df = load_reviews()
+                pending_mask = df['ai_response'].apply(lambda x: str(x).strip() == '')
+                pending_keys = list(df[pending_mask].index)
                 
-                if model:
-                    df = load_reviews()
-                    
-                    if df.empty:
-                        st.warning("No reviews to process")
-                    else:
-                        pending_mask = df['ai_response'].apply(lambda x: str(x).strip() == '')
-                        pending_df = df[pending_mask]
-                        
-                        if len(pending_df) == 0:
-                            st.info("✅ All reviews already processed!")
-                        else:
-                            processed_count = 0
-                            failed_count = 0
-                            
-                            progress_bar = st.progress(0)
-                            status_text = st.empty()
-                            
-                            for idx, (original_idx, row) in enumerate(pending_df.iterrows()):
-                                status_text.text(f"Processing review {idx + 1} of {len(pending_df)}...")
-                                
-                                try:
-                                    ai_content = generate_tech_analysis(
-                                        model,
-                                        int(row['rating']),
-                                        str(row['review'])
-                                    )
-                                    
-                                    success = update_review_with_ai(
-                                        original_idx,
-                                        ai_content['ai_response'],
-                                        ai_content['ai_summary'],
-                                        ai_content['recommended_actions']
-                                    )
-                                    
-                                    if success:
-                                        processed_count += 1
-                                    else:
-                                        failed_count += 1
-                                    
-                                    time.sleep(0.5)
-                                    
-                                except Exception as e:
-                                    failed_count += 1
-                                
-                                progress_bar.progress((idx + 1) / len(pending_df))
-                            
-                            status_text.empty()
-                            progress_bar.empty()
-                            
-                            if processed_count > 0:
-                                st.success(f"✅ Successfully processed {processed_count} reviews!")
-                                if failed_count > 0:
-                                    st.warning(f"⚠️ Failed to process {failed_count} reviews")
-                                time.sleep(1)
-                                st.rerun()
-                            else:
-                                st.error("❌ Failed to process reviews")
+                if df.empty:
+                    st.warning("No reviews to process")
+                elif not pending_keys:
+                    st.info("✅ All reviews already processed!")
                 else:
-                    st.error("❌ Failed to configure Gemini API")
+                    run_job = BatchJob.create(pending_keys, previous=batch_job)
+        
+        if batch_job is not None and run_job is None:
+            failed_rows = batch_job.failed_rows()
+            retryable = [row for row in failed_rows if row['attempts'] < MAX_ATTEMPTS] + batch_job.skipped_rows()
+            if failed_rows:
+                with st.expander(f"❌ Failed reviews ({len(failed_rows)})"):
+                    for row in failed_rows:
+                        st.caption(f"Review {row['key']} • {row['attempts']} attempt(s) • {row['error']}")
+            if retryable and st.button(f"🔁 Retry Failed & Skipped ({len(retryable)})", use_container_width=True):
+                batch_job.retry_failed()
+                run_job = batch_job
+        
+        if run_job is not None:
+            if run_job.acquire():
+                try:
+                    run_batch_job(run_job, api_key, budget_mode, daily_budget, run_budget)
+                finally:
+                    run_job.release()
+            else:
+                st.warning(f"🤝 Run {run_job.job_id} was just started in another admin session")
     else:
         st.info("💡 Enter your Gemini API key to enable AI processing")
     
@@ -238,19 +388,19 @@ with st.sidebar:
 
 df = load_reviews()
 
+search_index = get_search_index()
+search_index.sync(df)
+
+review_rollup = get_review_rollup()
+review_rollup.sync(df)
+since = window_start(date_filter)
+
 if not df.empty and 'timestamp' in df.columns:
     df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
     df = df.dropna(subset=['timestamp'])
     
-    if date_filter == "Today":
-        today = datetime.now().date()
-        df = df[df['timestamp'].dt.date == today]
-    elif date_filter == "Last 7 Days":
-        week_ago = datetime.now() - timedelta(days=7)
-        df = df[df['timestamp'] >= week_ago]
-    elif date_filter == "Last 30 Days":
-        month_ago = datetime.now() - timedelta(days=30)
-        df = df[df['timestamp'] >= month_ago]
+    if since is not None:
+        df = df[df['timestamp'] >= since]
     
     df = df[df['rating'].isin(rating_filter)]
 
@@ -259,11 +409,12 @@ if df.empty:
     st.info("💡 Try adjusting your filters or submit reviews via the User Dashboard")
     st.stop()
 
-total_reviews = len(df)
-avg_rating = df['rating'].mean()
-critical_reviews = len(df[df['rating'] <= 2])
-positive_reviews = len(df[df['rating'] >= 4])
-pending_count = len(df[df['ai_response'].apply(lambda x: str(x).strip() == '')])
+metrics = review_rollup.summary(since, rating_filter)
+total_reviews = metrics['total']
+avg_rating = metrics['avg_rating']
+critical_reviews = metrics['critical']
+positive_reviews = metrics['positive']
+pending_count = metrics['pending']
 
 st.markdown("## 📈 Key Metrics")
 col1, col2, col3, col4, col5 = st.columns(5)
@@ -286,7 +437,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("### 📊 Rating Distribution")
     try:
-        rating_counts = df['rating'].value_counts().sort_index()
+        rating_counts = review_rollup.rating_counts(since, rating_filter)
         colors = [get_sentiment_color(int(i)) for i in rating_counts.index]
         
         fig = go.Figure()
@@ -309,15 +460,13 @@ with col1:
 
 with col2:
     st.markdown("### 📅 Reviews Timeline")
+    granularity = st.radio("Granularity", list(GRANULARITY_FREQ), index=1, horizontal=True, label_visibility="collapsed")
     try:
-        if len(df) > 1:
-            df_timeline = df.copy()
-            df_timeline['date'] = df_timeline['timestamp'].dt.date
-            timeline = df_timeline.groupby('date').size().reset_index(name='count')
-            
+        timeline = review_rollup.timeline(GRANULARITY_FREQ[granularity], since, rating_filter)
+        if len(timeline) > 1:
             fig = go.Figure()
             fig.add_trace(go.Scatter(
-                x=timeline['date'], y=timeline['count'],
+                x=timeline.index, y=timeline.values,
                 mode='lines+markers', line=dict(color='#667eea', width=3),
                 marker=dict(size=10, color='#667eea'),
                 fill='tozeroy', fillcolor='rgba(102, 126, 234, 0.2)'
@@ -325,7 +474,7 @@ with col2:
             fig.update_layout(
                 height=320, showlegend=False, plot_bgcolor='white',
                 margin=dict(t=20, b=20, l=20, r=20),
-                xaxis_title="Date", yaxis_title="Reviews"
+                xaxis_title="Hour" if granularity == "Hourly" else "Date", yaxis_title="Reviews"
             )
             st.plotly_chart(fig, use_container_width=True)
         else:
@@ -352,6 +501,13 @@ with col2:
 with col3:
     display_mode = st.selectbox("Display", ["Show All", "Recent 5", "Recent 10"], index=0)
 
+search_query = st.text_input(
+    "🔍 Search reviews",
+    placeholder="Search reviews, summaries and recommended actions...",
+    help="All words must match; partial words match as prefixes (e.g. 'crash' finds 'crashes')"
+)
+search_highlights = {}
+
 try:
     if sort_option == "Pending First":
         df['has_ai'] = df['ai_response'].apply(lambda x: str(x).strip() != '')
@@ -373,7 +529,31 @@ if show_critical:
         st.success("✅ No critical reviews found!")
         st.stop()
 
-if display_mode == "Recent 5":
+if search_query.strip():
+    if st.session_state.get('search_page_query') != search_query:
+        st.session_state.search_page_query = search_query
+        st.session_state.search_page = 1
+    
+    # One ranked pass per rerun; the index caches the ranking per query
+    results = search_index.search(
+        search_query,
+        page=st.session_state.get('search_page', 1),
+        page_size=SEARCH_PAGE_SIZE,
+        allowed=set(df.index)
+    )
+    
+    if results['pages'] > 1:
+        st.session_state.search_page = results['page']
+        st.number_input("Page", min_value=1, max_value=results['pages'], step=1, key='search_page')
+    
+    if results['total'] == 0:
+        st.warning(f"🔍 No reviews match \"{search_query}\"")
+        st.stop()
+    
+    search_highlights = {hit['doc_id']: hit['highlights'] for hit in results['hits']}
+    df = df.loc[[hit['doc_id'] for hit in results['hits']]]
+    st.info(f"🔍 {results['total']} matching reviews • page {results['page']} of {results['pages']}")
+elif display_mode == "Recent 5":
     df = df.head(5)
     st.info(f"📊 Showing 5 most recent reviews")
 elif display_mode == "Recent 10":
@@ -382,28 +562,25 @@ elif display_mode == "Recent 10":
 else:
     st.info(f"📊 Showing all {len(df)} reviews")
 
-for idx, row in df.iterrows():
+for card in prepare_review_cards(df):
     try:
-        rating = int(row.get('rating', 3))
-        review_text = safe_get_value(row, 'review', 'No review text')
-        timestamp = row.get('timestamp', datetime.now())
-        
-        ai_actions = safe_get_value(row, 'recommendation_actions') 
-        if not ai_actions:
-            ai_actions = safe_get_value(row, 'recommended_actions')
-            
-        ai_response = safe_get_value(row, 'ai_response')
-        
-        emoji = get_rating_emoji(rating)
-        color = get_sentiment_color(rating)
-        label = get_rating_text(rating)
-        has_ai = len(ai_response) > 0
+        idx = card['idx']
+        rating = card['rating']
+        review_text = card['review_text']
+        ai_actions = card['ai_actions']
+        ai_response = card['ai_response']
+        emoji = card['emoji']
+        color = card['color']
+        label = card['label']
+        has_ai = card['has_ai']
+        is_new = card['is_new']
         
-        try:
-            time_diff = (datetime.now() - pd.to_datetime(timestamp)).total_seconds()
-            is_new = time_diff < 300
-        except:
-            is_new = False
+        highlights = search_highlights.get(idx)
+        review_html = highlights['review'] if highlights else review_text
+        if highlights and highlights['recommended_actions']:
+            ai_actions_html = highlights['recommended_actions']
+        else:
+            ai_actions_html = ai_actions
         
         st.markdown(f'<div class="review-card" style="border-left-color: {color};">', unsafe_allow_html=True)
         
@@ -421,16 +598,19 @@ for idx, row in df.iterrows():
                 st.markdown('<span class="pending-badge">⏳ Pending AI</span>', unsafe_allow_html=True)
         
         with col3:
-            st.markdown(f'<span class="time-badge">🕐 {time_ago(timestamp)}</span>', unsafe_allow_html=True)
+            st.markdown(f'<span class="time-badge">🕐 {card["time_ago"]}</span>', unsafe_allow_html=True)
+        
+        st.markdown(f'<div class="review-text">"{review_html}"</div>', unsafe_allow_html=True)
         
-        st.markdown(f'<div class="review-text">"{review_text}"</div>', unsafe_allow_html=True)
+        if highlights and highlights['ai_summary'] and '<mark>' in highlights['ai_summary']:
+            st.markdown(f'<div class="ai-content">📌 {highlights["ai_summary"]}</div>', unsafe_allow_html=True)
         
         if has_ai:
             if ai_actions:
                 st.markdown(f'''
                 <div class="ai-section">
                     <div class="ai-title">🎯 Recommended Actions</div>
-                    <div class="ai-content">{ai_actions}</div>
+                    <div class="ai-content">{ai_actions_html}</div>
                 </div>
                 ''', unsafe_allow_html=True)
             
@@ -443,20 +623,45 @@ for idx, row in df.iterrows():
             else:
                 if st.button(f"🤖 Generate AI Analysis", key=f"gen_{idx}", type="secondary"):
                     model = configure_gemini_api(api_key)
+                    worker_id = st.session_state.worker_id
                     if model:
-                        with st.spinner("Generating..."):
-                            try:
-                                ai_content = generate_tech_analysis(model, rating, review_text)
-                                success = update_review_with_ai(idx, ai_content['ai_response'], ai_content['ai_summary'], ai_content['recommended_actions'])
-                                
-                                if success:
-                                    st.success("✅ AI analysis generated!")
-                                    time.sleep(1)
-                                    st.rerun()
-                                else:
-                                    st.warning("⚠️ Update failed")
-                            except Exception as e:
-                                st.warning(f"⚠️ Generation failed")
+                        claim_error = None
+                        try:
+                            sheets = open_review_sheets()
+                            claimed = claim_reviews([idx], worker_id, sheets=sheets)
+                        except Exception as e:
+                            claim_error = e
+                        
+                        if claim_error is not None:
+                            st.error(f"❌ Claim error: {str(claim_error)}")
+                        elif idx not in claimed:
+                            st.info("🤝 Another admin session is already processing this review")
+                        else:
+                            with st.spinner("Generating..."):
+                                try:
+                                    ai_content = generate_with_budget(
+                                        model, rating, review_text, budget_mode, daily_budget=daily_budget
+                                    )
+                                    success = update_review_with_ai(
+                                        idx, ai_content['ai_response'], ai_content['ai_summary'], ai_content['recommended_actions'],
+                                        owner=worker_id, expected_version=claimed[idx], sheets=sheets
+                                    )
+                                    
+                                    if success:
+                                        st.success("✅ AI analysis generated!")
+                                        time.sleep(1)
+                                        st.rerun()
+                                    else:
+                                        release_reviews([idx], worker_id, sheets=sheets)
+                                        st.warning("⚠️ Update failed")
+                                except ReviewConflictError:
+                                    st.info("🤝 Another admin session already processed this review")
+                                except BudgetExceededError as e:
+                                    release_reviews([idx], worker_id, sheets=sheets)
+                                    st.warning(f"💰 {e}")
+                                except Exception as e:
+                                    release_reviews([idx], worker_id, sheets=sheets)
+                                    st.warning(f"⚠️ Generation failed")
                     else:
                         st.warning("⚠️ API connection failed")
         
@@ -465,6 +670,36 @@ for idx, row in df.iterrows():
     except Exception as e:
         continue
 
+st.markdown("---")
+st.markdown("## 💰 AI Usage & Cost")
+
+today_usage = usage_meter.today()
+today_calls = today_usage['calls']
+col1, col2, col3, col4 = st.columns(4)
+
+with col1:
+    st.metric("💵 Cost Today", f"${today_usage['cost']:.4f}")
+with col2:
+    st.metric("📞 Gemini Calls Today", today_calls)
+with col3:
+    st.metric("🔤 Tokens Today", f"{today_usage['prompt_tokens'] + today_usage['output_tokens']:,}")
+with col4:
+    st.metric("⏱️ Avg Latency", f"{today_usage['latency_ms'] / today_calls:.0f} ms" if today_calls else "—")
+
+if daily_budget:
+    st.progress(min(today_usage['cost'] / daily_budget, 1.0), text=f"Daily budget: ${today_usage['cost']:.4f} of ${daily_budget:.2f}")
+
+tab_runs, tab_days, tab_models, tab_prompts = st.tabs(["🏃 Recent Runs", "📅 By Day", "🤖 By Model", "🧾 By Prompt Version"])
+with tab_runs:
+    st.dataframe(usage_meter.summary('run', limit=20), use_container_width=True, hide_index=True)
+with tab_days:
+    st.dataframe(usage_meter.summary('day', limit=30), use_container_width=True, hide_index=True)
+with tab_models:
+    st.dataframe(usage_meter.summary('model'), use_container_width=True, hide_index=True)
+with tab_prompts:
+    st.caption("Compare avg prompt tokens and latency between prompt versions; tokens saved are estimated against the v1 prompts.")
+    st.dataframe(usage_meter.summary('prompt'), use_container_width=True, hide_index=True)
+
 st.markdown("---")
 st.markdown("## 💾 Export Data")
 
@@ -1,5 +1,19 @@
+import uuid
 import streamlit as st
-from utils import save_review, get_rating_emoji, get_rating_text, get_sentiment_color
+from utils import build_review_row, append_review_rows, get_rating_emoji, get_rating_text, get_sentiment_color
+from admission import SubmissionGate, SUBMIT_SAVED, SUBMIT_DUPLICATE, SUBMIT_RATE_LIMITED
+
+@st.cache_resource
+def get_submission_gate():
+    """Process-wide admission layer shared by every portal session"""
+    return SubmissionGate(
+        append_review_rows,
+        session_rate=1 / 10,
+        session_burst=3,
+        global_rate=10,
+        global_burst=50,
+        batch_window=0.1
+    )
 
 st.set_page_config(page_title="Customer Feedback", page_icon="⭐", layout="centered")
 
@@ -55,6 +69,10 @@ if 'submitted' not in st.session_state:
     st.session_state.submitted = False
 if 'current_rating' not in st.session_state:
     st.session_state.current_rating = 3
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'submission_key' not in st.session_state:
+    st.session_state.submission_key = uuid.uuid4().hex
 
 if not st.session_state.submitted:
     st.markdown("### 📊 Rate Your Experience")
@@ -87,12 +105,20 @@ if not st.session_state.submitted:
             st.error("❌ Minimum 10 characters required")
         else:
             with st.spinner("Submitting..."):
-                if save_review(rating, review):
-                    st.session_state.submitted = True
-                    st.session_state.saved_rating = rating
-                    st.rerun()
-                else:
-                    st.error("❌ Submission failed. Please try again.")
+                status = get_submission_gate().submit(
+                    st.session_state.session_id,
+                    st.session_state.submission_key,
+                    build_review_row(rating, review)
+                )
+            
+            if status in (SUBMIT_SAVED, SUBMIT_DUPLICATE):
+                st.session_state.submitted = True
+                st.session_state.saved_rating = rating
+                st.rerun()
+            elif status == SUBMIT_RATE_LIMITED:
+                st.warning("⏳ Too many submissions right now. Please wait a moment and try again.")
+            else:
+                st.error("❌ Submission failed. Please try again.")
 
 else:
     st.markdown("""
@@ -110,6 +136,7 @@ else:
     if st.button("📝 Submit Another", type="primary", use_container_width=True):
         st.session_state.submitted = False
         st.session_state.current_rating = 3
+        st.session_state.submission_key = uuid.uuid4().hex
         st.rerun()
 
 st.markdown("---")
@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+JOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'batch_jobs')
+
+ROW_PENDING = 'pending'
+ROW_DONE = 'done'
+ROW_FAILED = 'failed'
+ROW_SKIPPED = 'skipped'
+
+MAX_ATTEMPTS = 3
+LOCK_STALE_SECONDS = 300
+
+
+class BatchJob:
+    """
+    AI batch run with a per-row checkpoint persisted to disk after every step.
+    Each job has its own checkpoint file, and a session runs a job only while
+    holding its lock file, so concurrent admin sessions never share a job.
+    """
+
+    def __init__(self, job_id, rows, created_at, job_dir=JOB_DIR):
+        self.job_id = job_id
+        self.rows = rows
+        self.created_at = created_at
+        self.job_dir = job_dir
+        self.path = os.path.join(job_dir, f"{job_id}.json")
+        self.lock_path = f"{self.path}.lock"
+        self.locked = False
+        self._by_key = {row['key']: row for row in rows}
+
+    @classmethod
+    def create(cls, keys, previous=None, job_dir=JOB_DIR):
+        """Start a job over `keys`, carrying attempt counts over from a previous job"""
+        carried = previous._by_key if previous is not None else {}
+        rows = []
+        for key in keys:
+            attempts = carried.get(key, {}).get('attempts', 0)
+            rows.append({
+                'key': key,
+                'state': ROW_FAILED if attempts >= MAX_ATTEMPTS else ROW_PENDING,
+                'attempts': attempts,
+                'error': carried.get(key, {}).get('error', '')
+            })
+        job = cls(uuid.uuid4().hex[:8], rows, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), job_dir)
+        job.save()
+        if previous is not None and not previous.is_locked():
+            previous.discard()
+        return job
+
+    @classmethod
+    def load(cls, job_id, job_dir=JOB_DIR):
+        """Load a persisted job, or None if there is none (or it is unreadable)"""
+        try:
+            with open(os.path.join(job_dir, f"{job_id}.json"), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(data['job_id'], data['rows'], data['created_at'], job_dir)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @classmethod
+    def latest(cls, job_dir=JOB_DIR):
+        """The most recently created persisted job, or None"""
+        try:
+            names = [name for name in os.listdir(job_dir) if name.endswith('.json')]
+        except OSError:
+            return None
+        jobs = [cls.load(name[:-len('.json')], job_dir) for name in names]
+        jobs = [job for job in jobs if job is not None]
+        return max(jobs, key=lambda job: job.created_at) if jobs else None
+
+    def save(self):
+        """Atomically write the checkpoint"""
+        os.makedirs(self.job_dir, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'job_id': self.job_id, 'created_at': self.created_at, 'rows': self.rows}, f)
+        os.replace(tmp_path, self.path)
+        if self.locked:
+            os.utime(self.lock_path)
+
+    def is_locked(self):
+        """True while another session is running this job"""
+        try:
+            return time.time() - os.path.getmtime(self.lock_path) < LOCK_STALE_SECONDS
+        except OSError:
+            return False
+
+    def acquire(self):
+        """
+        Take the run lock. A lock not refreshed for LOCK_STALE_SECONDS (its
+        session died mid-run) is taken over; two sessions racing for the same
+        stale lock can both succeed, which the review leases still tolerate.
+        """
+        os.makedirs(self.job_dir, exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                self.locked = True
+                return True
+            except FileExistsError:
+                if self.is_locked():
+                    return False
+                try:
+                    os.remove(self.lock_path)
+                except OSError:
+                    pass
+        return False
+
+    def release(self):
+        """Drop the run lock"""
+        if self.locked:
+            self.locked = False
+            try:
+                os.remove(self.lock_path)
+            except OSError:
+                pass
+
+    def discard(self):
+        """Delete the checkpoint file"""
+        self.release()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def pending_keys(self):
+        return [row['key'] for row in self.rows if row['state'] == ROW_PENDING]
+
+    def failed_rows(self):
+        return [row for row in self.rows if row['state'] == ROW_FAILED]
+
+    def skipped_rows(self):
+        return [row for row in self.rows if row['state'] == ROW_SKIPPED]
+
+    def mark_done(self, key, attempted=True):
+        row = self._by_key[key]
+        row['state'] = ROW_DONE
+        if attempted:
+            row['attempts'] += 1
+        row['error'] = ''
+        self.save()
+
+    def mark_failed(self, key, error):
+        row = self._by_key[key]
+        row['state'] = ROW_FAILED
+        row['attempts'] += 1
+        row['error'] = str(error)[:200]
+        self.save()
+
+    def mark_skipped(self, key, reason):
+        """Leave a row to whoever else is (or was) handling it"""
+        row = self._by_key[key]
+        row['state'] = ROW_SKIPPED
+        row['error'] = str(reason)[:200]
+        self.save()
+
+    def retry_failed(self):
+        """
+        Move failed rows with attempts left, and rows skipped because another
+        worker held them, back to pending; returns how many
+        """
+        retried = 0
+        for row in self.rows:
+            if (row['state'] == ROW_FAILED and row['attempts'] < MAX_ATTEMPTS) or row['state'] == ROW_SKIPPED:
+                row['state'] = ROW_PENDING
+                retried += 1
+        if retried:
+            self.save()
+        return retried
+
+    def counts(self):
+        counts = {ROW_PENDING: 0, ROW_DONE: 0, ROW_FAILED: 0, ROW_SKIPPED: 0}
+        for row in self.rows:
+            counts[row['state']] += 1
+        return counts
+
+    @property
+    def is_finished(self):
+        return not any(row['state'] == ROW_PENDING for row in self.rows)
@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+USAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ai_usage.jsonl')
+
+# USD per 1M tokens: (prompt, response)
+MODEL_PRICES = {
+    'gemini-2.5-flash-lite': (0.10, 0.40),
+    'gemini-2.5-flash': (0.30, 2.50),
+    'gemini-2.5-pro': (1.25, 10.00)
+}
+DEFAULT_PRICE = (0.30, 2.50)
+
+BUDGET_PAUSE = 'pause'
+BUDGET_FALLBACK = 'fallback'
+
+
+class BudgetExceededError(Exception):
+    """Raised before a Gemini call when the daily or per-run budget is spent"""
+
+
+def model_name(model):
+    """Short model name ('gemini-2.5-flash-lite') for a GenerativeModel"""
+    name = getattr(model, 'model_name', None) or str(model)
+    return name.split('/')[-1]
+
+
+def call_cost(model, prompt_tokens, output_tokens):
+    prompt_price, output_price = MODEL_PRICES.get(model, DEFAULT_PRICE)
+    return (prompt_tokens * prompt_price + output_tokens * output_price) / 1_000_000
+
+
+def _empty_totals():
+    return {'calls': 0, 'errors': 0, 'prompt_tokens': 0, 'output_tokens': 0, 'tokens_saved': 0, 'cost': 0.0, 'latency_ms': 0.0}
+
+
+class UsageMeter:
+    """
+    Records token usage, latency and cost for every Gemini call and enforces
+    budgets. Aggregates are built from the shared usage file, which is tailed
+    before every read, so budgets cover the calls of every process.
+    """
+
+    def __init__(self, path=USAGE_PATH):
+        self.path = path
+        self.offset = 0
+        self.by_day = defaultdict(_empty_totals)
+        self.by_model = defaultdict(_empty_totals)
+        self.by_run = defaultdict(_empty_totals)
+        self.by_prompt = defaultdict(_empty_totals)
+        self.run_started = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _tail(self):
+        """Aggregate complete lines appended to the usage file since the last read"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+        except OSError:
+            return
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            try:
+                self._aggregate(json.loads(line))
+            except (ValueError, KeyError):
+                continue
+        self.offset += end
+
+    def refresh(self):
+        """Pick up calls recorded by other processes"""
+        with self._lock:
+            self._tail()
+
+    def _aggregate(self, record):
+        keys = [
+            (self.by_day, record['day']),
+            (self.by_model, record['model']),
+            (self.by_prompt, f"{record['task']}@{record.get('prompt_version', 'v1')}")
+        ]
+        if record.get('run_id'):
+            keys.append((self.by_run, record['run_id']))
+            self.run_started.setdefault(record['run_id'], record['ts'])
+        for table, key in keys:
+            totals = table[key]
+            totals['calls'] += 1
+            totals['errors'] += 0 if record['ok'] else 1
+            totals['prompt_tokens'] += record['prompt_tokens']
+            totals['output_tokens'] += record['output_tokens']
+            totals['tokens_saved'] += record.get('tokens_saved', 0)
+            totals['cost'] += record['cost']
+            totals['latency_ms'] += record['latency_ms']
+
+    def record(self, model, task, prompt_tokens, output_tokens, latency_ms, ok=True, run_id=None,
+               prompt_version='v1', tokens_saved=0):
+        now = datetime.now()
+        record = {
+            'ts': now.strftime("%Y-%m-%d %H:%M:%S"),
+            'day': now.strftime("%Y-%m-%d"),
+            'run_id': run_id,
+            'model': model,
+            'task': task,
+            'prompt_version': prompt_version,
+            'prompt_tokens': int(prompt_tokens),
+            'output_tokens': int(output_tokens),
+            'tokens_saved': int(tokens_saved),
+            'cost': call_cost(model, prompt_tokens, output_tokens),
+            'latency_ms': round(latency_ms, 1),
+            'ok': ok
+        }
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+                self._tail()
+            except OSError:
+                self._aggregate(record)
+        return record
+
+    def today(self):
+        with self._lock:
+            self._tail()
+            return dict(self.by_day.get(datetime.now().strftime("%Y-%m-%d"), _empty_totals()))
+
+    def check_budget(self, run_id=None, daily_budget=None, run_budget=None):
+        """Raise BudgetExceededError if the daily or per-run budget (USD) is used up"""
+        with self._lock:
+            self._tail()
+            day_cost = self.by_day.get(datetime.now().strftime("%Y-%m-%d"), _empty_totals())['cost']
+            run_cost = self.by_run.get(run_id, _empty_totals())['cost']
+        if daily_budget and day_cost >= daily_budget:
+            raise BudgetExceededError(f"Daily AI budget of ${daily_budget:.2f} reached")
+        if run_id and run_budget and run_cost >= run_budget:
+            raise BudgetExceededError(f"Per-run AI budget of ${run_budget:.2f} reached")
+
+    def summary(self, by='day', limit=None):
+        """Aggregated usage rows, newest first for days and runs"""
+        table = {'day': self.by_day, 'model': self.by_model, 'run': self.by_run, 'prompt': self.by_prompt}[by]
+        with self._lock:
+            self._tail()
+            rows = []
+            for key, totals in table.items():
+                calls = totals['calls'] or 1
+                rows.append({
+                    by: key,
+                    'started': self.run_started.get(key, '') if by == 'run' else None,
+                    'calls': totals['calls'],
+                    'errors': totals['errors'],
+                    'prompt_tokens': totals['prompt_tokens'],
+                    'output_tokens': totals['output_tokens'],
+                    'avg_prompt_tokens': round(totals['prompt_tokens'] / calls, 1),
+                    'tokens_saved': totals['tokens_saved'],
+                    'cost_usd': round(totals['cost'], 6),
+                    'avg_latency_ms': round(totals['latency_ms'] / calls, 1),
+                    'cost_per_call_usd': round(totals['cost'] / calls, 6)
+                })
+        if by == 'run':
+            rows.sort(key=lambda row: row['started'], reverse=True)
+        else:
+            for row in rows:
+                row.pop('started')
+            rows.sort(key=lambda row: row[by], reverse=(by == 'day'))
+        return rows[:limit] if limit else rows
+
+
+usage_meter = UsageMeter()
+
+
+def metered_generate(model, prompt, task, run_id=None, meter=None, prompt_version='v1', tokens_saved=0):
+    """
+    Call model.generate_content and record prompt/response tokens, latency and cost.
+    Token counts come from the response's usage_metadata, or a chars/4
+    estimate when the SDK does not return it.
+    """
+    meter = meter or usage_meter
+    name = model_name(model)
+    started = time.perf_counter()
+    try:
+        response = model.generate_content(prompt)
+    except Exception:
+        meter.record(name, task, 0, 0, (time.perf_counter() - started) * 1000, ok=False, run_id=run_id,
+                     prompt_version=prompt_version)
+        raise
+
+    latency_ms = (time.perf_counter() - started) * 1000
+    usage = getattr(response, 'usage_metadata', None)
+    prompt_tokens = getattr(usage, 'prompt_token_count', None)
+    output_tokens = getattr(usage, 'candidates_token_count', None)
+    if prompt_tokens is None:
+        prompt_tokens = len(str(prompt)) // 4
+    if output_tokens is None:
+        try:
+            output_tokens = len(response.text) // 4
+        except Exception:
+            output_tokens = 0
+
+    meter.record(name, task, prompt_tokens, output_tokens, latency_ms, run_id=run_id,
+                 prompt_version=prompt_version, tokens_saved=tokens_saved)
+    return response
@@ -0,0 +1,138 @@
+import re
+
+from metering import metered_generate, model_name
+
+MAX_REVIEW_CHARS = 1200
+TRUNCATION_MARKER = " […] "
+
+# Original prompts, kept as v1 so token savings and latency can be compared.
+LEGACY_TEMPLATES = {
+    'tech_analysis': """
+    You are a Technical QA System. Analyze this feedback (Rating: {rating}/5):
+    "{review}"
+
+    1. Write a polite, short response to the user.
+    2. Provide 3 General-Purpose TECHNICAL Recommended Actions.
+       - Focus on: Code optimization, System quality, Performance, or Tech debt.
+       - CONSTRAINT: Each action must be under 10 words.
+       - Format: Action 1 | Action 2 | Action 3
+
+    Return strictly valid JSON:
+    {{
+        "ai_response": "Your response here...",
+        "recommended_actions": "Action 1 | Action 2 | Action 3"
+    }}
+    """,
+    'response': """You are a professional customer service representative. Write a brief, empathetic response (2-3 sentences) to this customer review:
+
+Rating: {rating}/5 stars
+Review: {review}
+
+Generate a professional response that:
+- Thanks the customer for their feedback
+- Addresses their sentiment appropriately
+- Is warm and genuine
+
+Response:""",
+    'summary': """Summarize this review in ONE concise sentence (maximum 12 words):
+
+Rating: {rating}/5
+Review: {review}
+
+Summary:""",
+    'actions': """Based on this customer feedback, suggest 3 specific, actionable steps the business should take. Format as a numbered list.
+
+Rating: {rating}/5 stars
+Review: {review}
+
+Provide 3 concrete action items:"""
+}
+
+# Compact templates: fixed instructions go in the system instruction,
+# the per-review prompt carries only the rating and (truncated) text.
+COMPACT_SYSTEM = {
+    'tech_analysis': (
+        'You are a technical QA assistant. Reply with JSON only: '
+        '{"ai_response": "<polite 1-2 sentence reply to the customer>", '
+        '"recommended_actions": "<action> | <action> | <action>"}. '
+        'Actions: 3 general technical fixes (code, quality, performance or tech debt), each under 10 words.'
+    ),
+    'response': (
+        'You are a customer service representative. Reply to the review in 2-3 warm, '
+        'empathetic sentences that thank the customer and match their sentiment. Output only the reply.'
+    ),
+    'summary': 'Reply with a one-sentence summary of the review, max 12 words.',
+    'actions': 'Suggest 3 specific, actionable steps the business should take for this customer review. Output a numbered list only.'
+}
+COMPACT_USER = "Rating: {rating}/5\nReview: {review}"
+
+PROMPT_TEMPLATES = {
+    'v1': {task: (None, template) for task, template in LEGACY_TEMPLATES.items()},
+    'v2': {task: (system, COMPACT_USER) for task, system in COMPACT_SYSTEM.items()}
+}
+ACTIVE_PROMPT_VERSION = 'v2'
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token)"""
+    return len(text or '') // 4
+
+
+def truncate_review(review, max_chars=MAX_REVIEW_CHARS):
+    """
+    Normalise whitespace and cap very long reviews, keeping the opening and
+    the closing part (where customers usually state the problem and the ask).
+    """
+    text = re.sub(r"\s+", " ", str(review)).strip()
+    if len(text) <= max_chars:
+        return text
+
+    budget = max_chars - len(TRUNCATION_MARKER)
+    head = text[:budget * 2 // 3]
+    tail = text[-(budget - len(head)):]
+    head = head[:head.rfind(' ')] if ' ' in head else head
+    tail = tail[tail.find(' ') + 1:] if ' ' in tail else tail
+    return f"{head}{TRUNCATION_MARKER}{tail}"
+
+
+def render_prompt(task, rating, review, version=None):
+    """Return (system_instruction, prompt) for a task using a template version"""
+    version = version or ACTIVE_PROMPT_VERSION
+    system, template = PROMPT_TEMPLATES[version][task]
+    if version != 'v1':
+        review = truncate_review(review)
+    return system, template.format(rating=rating, review=review)
+
+
+def get_task_model(model, system_instruction):
+    """
+    GenerativeModel carrying a task's system instruction. Built per call and
+    not cached: a model keeps the client (and API key) of its first request,
+    so a cached one would ignore a later genai.configure with a new key.
+    """
+    if not system_instruction:
+        return model
+
+    import google.generativeai as genai
+
+    return genai.GenerativeModel(model_name(model), system_instruction=system_instruction)
+
+
+def generate_for_task(model, task, rating, review, run_id=None, version=None):
+    """
+    Run one prompt task through the metered client. Records the prompt version
+    and the estimated tokens saved against the legacy (v1) prompt.
+    """
+    version = version or ACTIVE_PROMPT_VERSION
+    system, prompt = render_prompt(task, rating, review, version)
+    _, legacy_prompt = render_prompt(task, rating, review, 'v1')
+    tokens_saved = estimate_tokens(legacy_prompt) - estimate_tokens((system or '') + prompt)
+
+    return metered_generate(
+        get_task_model(model, system),
+        prompt,
+        task=task,
+        run_id=run_id,
+        prompt_version=version,
+        tokens_saved=tokens_saved
+    )
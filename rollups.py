@@ -0,0 +1,118 @@
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+ROLLUP_LEVELS = ['hour', 'rating', 'pending']
+
+GRANULARITY_FREQ = {
+    'Hourly': 'h',
+    'Daily': 'D',
+    'Weekly': 'W-MON'
+}
+
+
+def window_start(date_filter, now=None):
+    """Return the start of a dashboard time window, aligned to an hour boundary"""
+    now = now or datetime.now()
+    if date_filter == "Today":
+        return pd.Timestamp(now.date())
+    if date_filter == "Last 7 Days":
+        return pd.Timestamp(now - timedelta(days=7)).floor('h')
+    if date_filter == "Last 30 Days":
+        return pd.Timestamp(now - timedelta(days=30)).floor('h')
+    return None
+
+
+def _row_state(df):
+    """Vectorized (hour, rating, pending) bucket for every review row"""
+    state = pd.DataFrame(index=df.index)
+    state['hour'] = pd.to_datetime(df['timestamp'], errors='coerce').dt.floor('h')
+    state['rating'] = pd.to_numeric(df['rating'], errors='coerce').fillna(3).astype(int)
+    state['pending'] = df['ai_response'].astype(str).str.strip() == ''
+    return state.dropna(subset=['hour'])
+
+
+class ReviewRollup:
+    """Hourly review counts per rating and AI status, maintained incrementally"""
+
+    def __init__(self):
+        self.counts = pd.Series(dtype='int64', index=pd.MultiIndex.from_tuples([], names=ROLLUP_LEVELS))
+        self.state = pd.DataFrame(columns=ROLLUP_LEVELS)
+        self._lock = threading.Lock()
+
+    def _apply(self, rows, sign):
+        if rows.empty:
+            return
+        delta = rows.groupby(ROLLUP_LEVELS).size() * sign
+        counts = self.counts.add(delta, fill_value=0).astype('int64')
+        self.counts = counts[counts != 0].sort_index()
+
+    def sync(self, df):
+        """Apply only the rows that were added, removed or changed since the last sync"""
+        if df is None or df.empty:
+            new_state = pd.DataFrame(columns=ROLLUP_LEVELS)
+        else:
+            new_state = _row_state(df)
+
+        with self._lock:
+            old_state = self.state
+            common = new_state.index.intersection(old_state.index)
+            changed = common[
+                (new_state.loc[common, ROLLUP_LEVELS] != old_state.loc[common, ROLLUP_LEVELS]).any(axis=1).to_numpy()
+            ]
+            added = new_state.index.difference(old_state.index)
+            removed = old_state.index.difference(new_state.index)
+
+            self._apply(old_state.loc[removed.append(changed)], -1)
+            self._apply(new_state.loc[added.append(changed)], 1)
+            self.state = new_state
+            return len(added) + len(removed) + len(changed)
+
+    def window(self, since=None, ratings=None):
+        """Bucket counts restricted to a time window and a set of ratings"""
+        with self._lock:
+            counts = self.counts
+        if counts.empty:
+            return counts
+        mask = pd.Series(True, index=counts.index)
+        if since is not None:
+            mask &= counts.index.get_level_values('hour') >= since
+        if ratings is not None:
+            mask &= counts.index.get_level_values('rating').isin(list(ratings))
+        return counts[mask.to_numpy()]
+
+    def summary(self, since=None, ratings=None):
+        """Headline metrics for the window, computed from buckets rather than rows"""
+        counts = self.window(since, ratings)
+        total = int(counts.sum())
+        if total == 0:
+            return {'total': 0, 'avg_rating': 0.0, 'critical': 0, 'positive': 0, 'pending': 0}
+        rating = counts.index.get_level_values('rating')
+        pending = counts.index.get_level_values('pending')
+        return {
+            'total': total,
+            'avg_rating': float((counts * rating).sum() / total),
+            'critical': int(counts[rating <= 2].sum()),
+            'positive': int(counts[rating >= 4].sum()),
+            'pending': int(counts[pending].sum())
+        }
+
+    def rating_counts(self, since=None, ratings=None):
+        """Review count per star rating"""
+        counts = self.window(since, ratings)
+        if counts.empty:
+            return pd.Series(dtype='int64')
+        return counts.groupby(level='rating').sum().sort_index()
+
+    def timeline(self, freq='D', since=None, ratings=None):
+        """Review count per time bucket ('h', 'D', 'W-MON', ...)"""
+        counts = self.window(since, ratings)
+        if counts.empty:
+            return pd.Series(dtype='int64')
+        per_hour = counts.groupby(level='hour').sum()
+        if freq == 'h':
+            return per_hour
+        if freq.startswith('W'):
+            return per_hour.resample(freq, label='left', closed='left').sum()
+        return per_hour.resample(freq).sum()
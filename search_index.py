@@ -0,0 +1,287 @@
+import html
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+import pandas as pd
+
+SEARCH_FIELDS = {
+    'review': 1.0,
+    'ai_summary': 0.6,
+    'recommended_actions': 0.6
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+WORD_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+RANK_CACHE_SIZE = 32
+
+
+def tokenize(text):
+    """Split text into lowercase alphanumeric terms"""
+    if text is None:
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class ReviewSearchIndex:
+    """Incrementally maintained inverted index over review text and AI output"""
+
+    def __init__(self, fields=None):
+        self.fields = dict(fields or SEARCH_FIELDS)
+        self.postings = {}
+        self.docs = {}
+        self.slot_ids = []
+        self.free_slots = []
+        self.lengths = {field: np.zeros(1024, dtype=np.int32) for field in self.fields}
+        self.field_lengths = defaultdict(int)
+        self._vocab = None
+        self._hashes = None
+        self._generation = 0
+        self._rank_cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _take_slot(self, doc_id):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.slot_ids[slot] = doc_id
+            return slot
+        slot = len(self.slot_ids)
+        self.slot_ids.append(doc_id)
+        for field, lengths in self.lengths.items():
+            if slot >= len(lengths):
+                self.lengths[field] = np.concatenate([lengths, np.zeros(len(lengths), dtype=np.int32)])
+        return slot
+
+    def _add(self, doc_id, values):
+        if doc_id in self.docs:
+            self._remove(doc_id)
+        self._generation += 1
+        slot = self._take_slot(doc_id)
+
+        texts = {}
+        lengths = {}
+        terms = set()
+        for field in self.fields:
+            text = '' if values.get(field) is None else str(values.get(field)).strip()
+            tokens = tokenize(text)
+            texts[field] = text
+            lengths[field] = len(tokens)
+            self.lengths[field][slot] = len(tokens)
+            self.field_lengths[field] += len(tokens)
+
+            counts = defaultdict(int)
+            for token in tokens:
+                counts[token] += 1
+            for token, tf in counts.items():
+                entry = self.postings.get(token)
+                if entry is None:
+                    entry = self.postings[token] = {f: {} for f in self.fields}
+                    self._vocab = None
+                entry[field][slot] = tf
+                terms.add(token)
+
+        self.docs[doc_id] = {
+            'signature': tuple(texts[field] for field in self.fields),
+            'texts': texts,
+            'lengths': lengths,
+            'terms': terms,
+            'slot': slot
+        }
+
+    def _remove(self, doc_id):
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self._generation += 1
+        slot = doc['slot']
+        for field, length in doc['lengths'].items():
+            self.field_lengths[field] -= length
+            self.lengths[field][slot] = 0
+        for token in doc['terms']:
+            entry = self.postings.get(token)
+            if entry is None:
+                continue
+            for field_postings in entry.values():
+                field_postings.pop(slot, None)
+            if not any(entry.values()):
+                del self.postings[token]
+                self._vocab = None
+        self.slot_ids[slot] = None
+        self.free_slots.append(slot)
+
+    def add(self, doc_id, values):
+        """Index (or re-index) a single document from a mapping of field -> text"""
+        with self._lock:
+            self._add(doc_id, values)
+
+    def remove(self, doc_id):
+        """Drop a document from the index"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def sync(self, df):
+        """
+        Bring the index in line with a reviews DataFrame. Rows are compared by a
+        vectorized content hash, so an unchanged frame costs one hash pass and
+        only added/changed rows are re-tokenised.
+        """
+        if df is None:
+            return 0
+
+        frame = df.reindex(columns=list(self.fields)).fillna('')
+        hashes = pd.Series(pd.util.hash_pandas_object(frame, index=False).to_numpy(), index=df.index)
+
+        with self._lock:
+            previous = self._hashes
+            if previous is not None and previous.index.equals(hashes.index) and (previous.to_numpy() == hashes.to_numpy()).all():
+                return 0
+
+            if previous is None:
+                todo = hashes.index
+            else:
+                common = hashes.index.intersection(previous.index)
+                changed_mask = (hashes.loc[common].to_numpy() != previous.loc[common].to_numpy())
+                todo = common[changed_mask].append(hashes.index.difference(previous.index))
+
+            changed = 0
+            rows = frame.loc[todo]
+            for doc_id, *values in zip(rows.index, *(rows[field] for field in self.fields)):
+                signature = tuple(str(v).strip() for v in values)
+                doc = self.docs.get(doc_id)
+                if doc is not None and doc['signature'] == signature:
+                    continue
+                self._add(doc_id, dict(zip(self.fields, signature)))
+                changed += 1
+
+            for doc_id in set(self.docs).difference(hashes.index):
+                self._remove(doc_id)
+                changed += 1
+
+            self._hashes = hashes
+        return changed
+
+    def _expand(self, term):
+        """Return all indexed terms starting with the given query term"""
+        if self._vocab is None:
+            self._vocab = sorted(self.postings)
+        matches = []
+        pos = bisect_left(self._vocab, term)
+        while pos < len(self._vocab) and self._vocab[pos].startswith(term):
+            matches.append(self._vocab[pos])
+            pos += 1
+        return matches
+
+    def _rank(self, query_terms):
+        """
+        Ranked (doc_id, score) list for documents containing every query term
+        (BM25, vectorized over document slots), cached until the index changes.
+        """
+        key = (tuple(query_terms), self._generation)
+        ranked = self._rank_cache.get(key)
+        if ranked is not None:
+            self._rank_cache.move_to_end(key)
+            return ranked
+
+        n_slots = len(self.slot_ids)
+        n_docs = max(len(self.docs), 1)
+        totals = np.zeros(n_slots)
+        matched = np.ones(n_slots, dtype=bool)
+
+        for term in query_terms:
+            term_hit = np.zeros(n_slots, dtype=bool)
+            for token in self._expand(term):
+                entry = self.postings[token]
+                arrays = {}
+                token_hit = np.zeros(n_slots, dtype=bool)
+                for field, field_postings in entry.items():
+                    if field_postings:
+                        slots = np.fromiter(field_postings.keys(), dtype=np.int64, count=len(field_postings))
+                        tfs = np.fromiter(field_postings.values(), dtype=np.float64, count=len(field_postings))
+                        arrays[field] = (slots, tfs)
+                        token_hit[slots] = True
+
+                doc_freq = int(token_hit.sum())
+                idf = math.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+                for field, (slots, tfs) in arrays.items():
+                    avg_len = self.field_lengths[field] / n_docs or 1
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[field][slots] / avg_len)
+                    totals[slots] += self.fields[field] * idf * tfs * (BM25_K1 + 1) / (tfs + norm)
+                term_hit |= token_hit
+            matched &= term_hit
+
+        candidates = np.nonzero(matched)[0]
+        order = candidates[np.argsort(-totals[candidates], kind='stable')]
+        ranked = [(self.slot_ids[slot], float(totals[slot])) for slot in order]
+
+        self._rank_cache[key] = ranked
+        while len(self._rank_cache) > RANK_CACHE_SIZE:
+            self._rank_cache.popitem(last=False)
+        return ranked
+
+    def search(self, query, page=1, page_size=20, allowed=None):
+        """
+        Rank documents matching every query term (prefix match) and return one page.
+        Results include highlighted HTML for each indexed field.
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms:
+            return {'hits': [], 'total': 0, 'page': 1, 'pages': 0, 'terms': query_terms}
+
+        with self._lock:
+            ranked = self._rank(query_terms)
+            if allowed is not None:
+                ranked = [item for item in ranked if item[0] in allowed]
+
+            total = len(ranked)
+            pages = max(math.ceil(total / page_size), 1) if total else 0
+            page = min(max(int(page), 1), max(pages, 1))
+            start = (page - 1) * page_size
+
+            hits = []
+            for doc_id, score in ranked[start:start + page_size]:
+                texts = self.docs[doc_id]['texts']
+                hits.append({
+                    'doc_id': doc_id,
+                    'score': score,
+                    'highlights': {field: highlight(texts[field], query_terms) for field in self.fields}
+                })
+
+        return {'hits': hits, 'total': total, 'page': page, 'pages': pages, 'terms': query_terms}
+
+
+def highlight(text, terms, max_chars=None):
+    """Escape text for HTML and wrap words matching any query term in <mark> tags"""
+    text = '' if text is None else str(text)
+    if not terms:
+        return html.escape(text)
+
+    matches = [m for m in WORD_PATTERN.finditer(text)
+               if any(m.group(0).lower().startswith(t) for t in terms)]
+
+    start, end = 0, len(text)
+    if max_chars and len(text) > max_chars:
+        first = matches[0].start() if matches else 0
+        start = max(first - max_chars // 3, 0)
+        end = min(start + max_chars, len(text))
+
+    parts = ['…' if start > 0 else '']
+    cursor = start
+    for m in matches:
+        if m.start() < start or m.end() > end:
+            continue
+        parts.append(html.escape(text[cursor:m.start()]))
+        parts.append(f'<mark>{html.escape(m.group(0))}</mark>')
+        cursor = m.end()
+    parts.append(html.escape(text[cursor:end]))
+    if end < len(text):
+        parts.append('…')
+    return ''.join(parts)
@@ -0,0 +1,127 @@
+"""In-memory stand-ins for the gspread Spreadsheet/Worksheet calls the app uses"""
+import re
+import threading
+
+import gspread
+from gspread.utils import a1_to_rowcol
+
+A1_PART = re.compile(r"([A-Z]+)(\d*)$")
+
+
+def parse_range(a1_range):
+    """(first_row, first_col, last_row, last_col); last_row is None for open-ended ranges"""
+    start, _, end = a1_range.split('!')[-1].partition(':')
+    first_row, first_col = a1_to_rowcol(start)
+    if not end:
+        return first_row, first_col, first_row, first_col
+    if A1_PART.match(end).group(2):
+        last_row, last_col = a1_to_rowcol(end)
+    else:
+        last_row, last_col = None, a1_to_rowcol(f"{end}1")[1]
+    return first_row, first_col, last_row, last_col
+
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.sheets = {}
+
+    def worksheet(self, title):
+        if title not in self.sheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def add_worksheet(self, title, rows, cols):
+        self.sheets[title] = FakeWorksheet([], self, title)
+        return self.sheets[title]
+
+
+class FakeWorksheet:
+    """
+    Cell grid with the read/write calls used by utils. Every call takes one
+    lock, so appends are applied one after another like Sheets does.
+    """
+
+    def __init__(self, rows, spreadsheet=None, title='Sheet1'):
+        self.data = [[str(value) for value in row] for row in rows]
+        self.spreadsheet = spreadsheet or FakeSpreadsheet()
+        self.spreadsheet.sheets.setdefault(title, self)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def row_count(self):
+        return max(len(self.data), 1000)
+
+    def _cell(self, row, col):
+        try:
+            return self.data[row - 1][col - 1]
+        except IndexError:
+            return ''
+
+    def _set(self, row, col, value):
+        while len(self.data) < row:
+            self.data.append([])
+        cells = self.data[row - 1]
+        while len(cells) < col:
+            cells.append('')
+        cells[col - 1] = str(value)
+
+    def _get(self, a1_range):
+        first_row, first_col, last_row, last_col = parse_range(a1_range)
+        last_row = len(self.data) if last_row is None else min(last_row, len(self.data))
+        values = []
+        for row in range(first_row, last_row + 1):
+            cells = [self._cell(row, col) for col in range(first_col, last_col + 1)]
+            while cells and cells[-1] == '':
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def row_values(self, row):
+        with self._lock:
+            self.calls += 1
+            return list(self.data[row - 1]) if row <= len(self.data) else []
+
+    def get(self, a1_range):
+        with self._lock:
+            self.calls += 1
+            return self._get(a1_range)
+
+    def batch_get(self, ranges):
+        with self._lock:
+            self.calls += 1
+            return [self._get(a1_range) for a1_range in ranges]
+
+    def get_all_records(self, numericise_ignore=None):
+        with self._lock:
+            self.calls += 1
+            header = self.data[0]
+            return [dict(zip(header, row + [''] * (len(header) - len(row)))) for row in self.data[1:]]
+
+    def batch_update(self, updates):
+        with self._lock:
+            self.calls += 1
+            for update in updates:
+                first_row, first_col, _, _ = parse_range(update['range'])
+                for i, values in enumerate(update['values']):
+                    for j, value in enumerate(values):
+                        self._set(first_row + i, first_col + j, value)
+
+    def update_cell(self, row, col, value):
+        with self._lock:
+            self.calls += 1
+            self._set(row, col, value)
+
+    def append_row(self, row, **kwargs):
+        self.append_rows([row], **kwargs)
+
+    def append_rows(self, rows, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.data.extend([str(value) for value in row] for row in rows)
+
+    def delete_row(self, row):
+        with self._lock:
+            del self.data[row - 1]
@@ -0,0 +1,121 @@
+import random
+import threading
+import time
+
+import pytest
+
+import utils
+from fake_sheets import FakeWorksheet
+
+REVIEW_IDS = [f"id{n}" for n in range(200)]
+
+
+def review_row(review_id):
+    return ["2024-01-01 10:00:00", 4, f"review {review_id}", '', '', '', review_id, 0, '', '']
+
+
+class ThreadClaimLog:
+    """Gives every thread its own ClaimLog, like separate server processes"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def __getattr__(self, name):
+        if not hasattr(self._local, 'log'):
+            self._local.log = utils.ClaimLog()
+        return getattr(self._local.log, name)
+
+
+@pytest.fixture
+def sheets(monkeypatch):
+    worksheet = FakeWorksheet([utils.REVIEW_COLUMNS] + [review_row(rid) for rid in REVIEW_IDS])
+    monkeypatch.setattr(utils, 'review_locator', utils.ReviewLocator())
+    monkeypatch.setattr(utils, 'claim_log', ThreadClaimLog())
+    return worksheet, utils.get_claims_sheet(worksheet)
+
+
+def column(name):
+    return utils.REVIEW_COLUMNS.index(name)
+
+
+def test_concurrent_claims_never_overlap(sheets, monkeypatch):
+    _, claims = sheets
+    append_rows = claims.append_rows
+
+    def slow_append_rows(rows, **kwargs):
+        # Widen the gap between reading the claim log and appending to it
+        time.sleep(random.random() / 200)
+        append_rows(rows, **kwargs)
+
+    monkeypatch.setattr(claims, 'append_rows', slow_append_rows)
+    won = {}
+
+    def worker(owner):
+        mine = {}
+        for start in range(0, len(REVIEW_IDS), 10):
+            mine.update(utils.claim_reviews(REVIEW_IDS[start:start + 10], owner, sheets=sheets))
+        won[owner] = mine
+
+    threads = [threading.Thread(target=worker, args=(f"job{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    claimed = [rid for mine in won.values() for rid in mine]
+    assert sorted(claimed) == sorted(REVIEW_IDS)
+    # Some reviews were claimed by more than one worker, and only one won each
+    assert len(claims.data) - 1 > len(REVIEW_IDS)
+
+
+def test_owner_renews_its_own_lease(sheets):
+    assert utils.claim_reviews(['id1'], 'job1', sheets=sheets) == {'id1': 0}
+    assert utils.claim_reviews(['id1'], 'job1', sheets=sheets) == {'id1': 0}
+    assert utils.claim_reviews(['id1'], 'job2', sheets=sheets) == {}
+
+
+def test_write_requires_the_lease(sheets):
+    worksheet, _ = sheets
+    version = utils.claim_reviews(['id3'], 'job1', sheets=sheets)['id3']
+
+    with pytest.raises(utils.ReviewConflictError):
+        utils.update_review_with_ai('id3', 'a', 'b', 'c', owner='job2', expected_version=version, sheets=sheets)
+    assert utils.update_review_with_ai('id3', 'a', 'b', 'c', owner='job1', expected_version=version, sheets=sheets)
+
+    row = worksheet.data[4]
+    assert row[column('ai_response')] == 'a'
+    assert row[column('version')] == '1'
+    assert row[column('lease_owner')] == ''
+    assert utils.claim_reviews(['id3'], 'job2', sheets=sheets) == {}
+
+
+def test_released_and_expired_leases_can_be_claimed(sheets, monkeypatch):
+    utils.claim_reviews(['id1', 'id2'], 'job1', lease_seconds=60, sheets=sheets)
+    utils.release_reviews(['id1'], 'job1', sheets=sheets)
+    assert utils.claim_reviews(['id1', 'id2'], 'job2', sheets=sheets) == {'id1': 0}
+
+    later = time.time() + 120
+    monkeypatch.setattr(utils.time, 'time', lambda: later)
+    assert utils.claim_reviews(['id2'], 'job2', sheets=sheets) == {'id2': 0}
+
+
+def test_claimed_write_after_row_deleted(sheets):
+    worksheet, _ = sheets
+    version = utils.claim_reviews(['id5'], 'job1', sheets=sheets)['id5']
+    worksheet.delete_row(2)  # id0
+
+    assert utils.update_review_with_ai('id5', 'a', 'b', 'c', owner='job1', expected_version=version, sheets=sheets)
+    assert worksheet.data[5][column('review_id')] == 'id5'
+    assert worksheet.data[5][column('ai_response')] == 'a'
+    assert [row[column('ai_response')] for row in worksheet.data[1:]].count('a') == 1
+
+
+def test_sheet_errors_are_raised_not_treated_as_lost_claims(sheets, monkeypatch):
+    worksheet, _ = sheets
+
+    def quota_exceeded(ranges):
+        raise RuntimeError("Quota exceeded")
+
+    monkeypatch.setattr(worksheet, 'batch_get', quota_exceeded)
+    with pytest.raises(RuntimeError):
+        utils.claim_reviews(['id1'], 'job1', sheets=sheets)
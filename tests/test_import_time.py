@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['pandas', 'gspread', 'oauth2client', 'google.generativeai', 'metering', 'prompts']
+IMPORT_BUDGET_MS = 100
+
+
+def run_python(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, '-c', code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def loaded_after(imports):
+    code = (
+        "import json, sys\n"
+        f"{imports}\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    return set(json.loads(run_python(code).stdout))
+
+
+def test_streamlit_import_does_not_load_heavy_modules():
+    # streamlit is unpinned; if a release starts importing pandas eagerly,
+    # the lazy import in utils no longer saves anything and this flags it.
+    assert loaded_after("import streamlit") == set()
+
+
+def test_utils_and_admission_import_lazily():
+    baseline = loaded_after("import streamlit")
+    assert loaded_after("import streamlit, utils, admission") - baseline == set()
+
+
+def test_utils_and_admission_import_budget():
+    result = run_python("import streamlit; import utils, admission", '-X', 'importtime')
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] in ('utils', 'admission'):
+            cumulative_us += int(parts[1])
+    assert 0 < cumulative_us < IMPORT_BUDGET_MS * 1000
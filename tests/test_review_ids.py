@@ -0,0 +1,59 @@
+import pytest
+
+import utils
+from fake_sheets import FakeWorksheet
+from rollups import ReviewRollup
+from search_index import ReviewSearchIndex
+
+
+def review_row(n, review_id, ai_response=''):
+    return [f"2024-01-0{n % 9 + 1} 10:00:00", n % 5 + 1, f"review number {n}", ai_response, '', '', review_id, 0, '', '']
+
+
+@pytest.fixture
+def worksheet(monkeypatch):
+    sheet = FakeWorksheet([utils.REVIEW_COLUMNS] + [review_row(n, f"id{n}") for n in range(5)])
+    monkeypatch.setattr(utils, 'get_google_sheet', lambda: sheet)
+    monkeypatch.setattr(utils, 'review_locator', utils.ReviewLocator())
+    return sheet
+
+
+def test_copied_row_gets_a_fresh_id(worksheet):
+    # A row copied in the sheet carries the original's review_id
+    worksheet.data.append(review_row(9, 'id2', ai_response='done'))
+
+    df = utils.load_reviews()
+
+    assert df.index.is_unique
+    assert len(df) == 6
+    assert df.loc['id2', 'review'] == 'review number 2'
+    copy_id = worksheet.data[6][utils.REVIEW_COLUMNS.index('review_id')]
+    assert copy_id not in ('', 'id2')
+    assert df.loc[copy_id, 'review'] == 'review number 9'
+
+    # Both syncs failed with duplicate labels
+    assert ReviewSearchIndex().sync(df) == 6
+    assert ReviewRollup().sync(df) == 6
+
+
+def test_missing_ids_are_backfilled(worksheet):
+    worksheet.data[1][utils.REVIEW_COLUMNS.index('review_id')] = ''
+
+    df = utils.load_reviews()
+
+    backfilled = worksheet.data[1][utils.REVIEW_COLUMNS.index('review_id')]
+    assert backfilled.startswith('legacy-')
+    assert df.index.is_unique and backfilled in df.index
+    assert utils.load_reviews().index.equals(df.index)
+
+
+def test_write_after_row_deleted_lands_on_shifted_row(worksheet):
+    utils.load_reviews()
+    worksheet.delete_row(2)  # id0; every cached row below it is now off by one
+
+    assert utils.update_review_with_ai('id3', 'response', 'summary', 'actions')
+
+    row = worksheet.data[3]
+    assert row[utils.REVIEW_COLUMNS.index('review_id')] == 'id3'
+    assert row[3:6] == ['response', 'summary', 'actions']
+    assert all(other[3] == '' for other in worksheet.data[1:] if other is not row)
@@ -1,32 +1,162 @@
-import pandas as pd
-import google.generativeai as genai
+import hashlib
+import threading
+import time
+import uuid
 from datetime import datetime
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+
+# pandas, gspread/oauth2client and the Gemini SDK are imported inside the
+# functions that use them, so the customer portal (which only appends rows)
+# does not pay for the admin-side dependencies at startup.
+
+REVIEW_COLUMNS = [
+    'timestamp', 'rating', 'review', 'ai_response', 'ai_summary', 'recommended_actions',
+    'review_id', 'version', 'lease_owner', 'lease_expires'
+]
+
+LEASE_SECONDS = 300
+
+CLAIMS_SHEET = 'claims'
+CLAIM_COLUMNS = ['review_id', 'owner', 'claimed_at', 'expires', 'action']
+
+class ReviewConflictError(Exception):
+    """Raised when a review's lease or version changed under a worker"""
+
+class ReviewLocator:
+    """review_id -> sheet row map, extended incrementally as rows are appended"""
+    
+    def __init__(self):
+        self.rows = {}
+        self.scanned = 1
+        self.columns = None
+        self._lock = threading.Lock()
+    
+    def column(self, worksheet, name):
+        """1-based column index for a header, read once per process"""
+        if self.columns is None or name not in self.columns:
+            self.columns = {header: i + 1 for i, header in enumerate(worksheet.row_values(1))}
+        return self.columns[name]
+    
+    def prime(self, review_ids, first_row=2):
+        """Record the rows of ids already read in sheet order (e.g. by load_reviews)"""
+        with self._lock:
+            for offset, review_id in enumerate(review_ids):
+                if review_id:
+                    self.rows[review_id] = first_row + offset
+            self.scanned = max(self.scanned, first_row + len(review_ids) - 1)
+    
+    def refresh(self, worksheet):
+        """Read only the id cells of rows appended since the last scan"""
+        from gspread.utils import rowcol_to_a1
+        
+        id_col = self.column(worksheet, 'review_id')
+        start = rowcol_to_a1(self.scanned + 1, id_col)
+        end = rowcol_to_a1(worksheet.row_count, id_col)
+        values = worksheet.get(f"{start}:{end}")
+        self.prime([cell[0] if cell else '' for cell in values], first_row=self.scanned + 1)
+    
+    def locate(self, worksheet, review_id):
+        """Return the sheet row for a review id, or None if it does not exist"""
+        row = self.rows.get(review_id)
+        if row is None:
+            self.refresh(worksheet)
+            row = self.rows.get(review_id)
+        return row
+    
+    def invalidate(self):
+        """Forget every cached row, e.g. after rows were deleted or re-sorted in the sheet"""
+        with self._lock:
+            self.rows = {}
+            self.scanned = 1
+
+review_locator = ReviewLocator()
+
+class ClaimLog:
+    """
+    Replays the append-only claims worksheet. Sheets applies appends one after
+    another, so every reader replays the same order and agrees on who holds
+    each review: the earliest claim made while no other live lease existed.
+    """
+    
+    def __init__(self):
+        self.holders = {}
+        self.scanned = 1
+        self._lock = threading.Lock()
+    
+    def _apply(self, review_id, owner, claimed_at, expires, action):
+        holder = self.holders.get(review_id)
+        if action == 'release':
+            if holder is not None and holder[0] == owner:
+                del self.holders[review_id]
+        elif holder is None or holder[0] == owner or holder[1] <= claimed_at:
+            self.holders[review_id] = (owner, expires)
+    
+    def refresh(self, claims):
+        """Replay only the claim rows appended since the last read"""
+        with self._lock:
+            values = claims.get(f"A{self.scanned + 1}:E")
+            for cells in values:
+                review_id, owner, claimed_at, expires, action = (list(cells) + [''] * 5)[:5]
+                try:
+                    self._apply(review_id, owner, float(claimed_at), float(expires), action)
+                except ValueError:
+                    pass
+            self.scanned += len(values)
+    
+    def holder(self, review_id, now=None):
+        """Owner of the live lease on a review, or None"""
+        holder = self.holders.get(review_id)
+        if holder is None or holder[1] <= (time.time() if now is None else now):
+            return None
+        return holder[0]
+
+claim_log = ClaimLog()
+
+def new_review_id():
+    """Generate a stable id for a new review"""
+    return uuid.uuid4().hex
+
+def legacy_review_id(sheet_row, timestamp, review):
+    """Deterministic id for rows written before review ids existed"""
+    digest = hashlib.sha1(f"{sheet_row}|{timestamp}|{review}".encode('utf-8')).hexdigest()
+    return f"legacy-{digest[:16]}"
+
+def open_worksheet(notify=False):
+    """Open the reviews worksheet and add any missing header columns; raises on failure"""
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+    
+    scope = ['https://spreadsheets.google.com/feeds',
+             'https://www.googleapis.com/auth/drive']
+    
+    creds_dict = dict(st.secrets["gcp_service_account"])
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
+    client = gspread.authorize(creds)
+    
+    sheet_url = st.secrets["SHEET_URL"]
+    sheet = client.open_by_url(sheet_url)
+    worksheet = sheet.sheet1
+    
+    headers = worksheet.row_values(1)
+    
+    if not headers:
+        worksheet.append_row(REVIEW_COLUMNS)
+        if notify:
+            st.success("✅ Initialized Google Sheet headers")
+    else:
+        for col in REVIEW_COLUMNS:
+            if col not in headers:
+                headers.append(col)
+                worksheet.update_cell(1, len(headers), col)
+    
+    return worksheet
 
 def get_google_sheet():
     """Connect to Google Sheets with detailed error handling"""
+    import gspread
+    
     try:
-        scope = ['https://spreadsheets.google.com/feeds',
-                 'https://www.googleapis.com/auth/drive']
-        
-        creds_dict = dict(st.secrets["gcp_service_account"])
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-        client = gspread.authorize(creds)
-        
-        sheet_url = st.secrets["SHEET_URL"]
-        sheet = client.open_by_url(sheet_url)
-        worksheet = sheet.sheet1
-        
-        headers = worksheet.row_values(1)
-        expected = ['timestamp', 'rating', 'review', 'ai_response', 'ai_summary', 'recommended_actions']
-        
-        if not headers:
-            worksheet.append_row(expected)
-            st.success("✅ Initialized Google Sheet headers")
-        
-        return worksheet
+        return open_worksheet(notify=True)
     except KeyError as e:
         st.error(f"❌ Missing secret: {str(e)}")
         return None
@@ -37,25 +167,49 @@ def get_google_sheet():
         st.error(f"❌ Connection error: {str(e)}")
         return None
 
+def get_claims_sheet(worksheet):
+    """The append-only claims worksheet next to the reviews, created on first use"""
+    import gspread
+    
+    sheet = worksheet.spreadsheet
+    try:
+        return sheet.worksheet(CLAIMS_SHEET)
+    except gspread.exceptions.WorksheetNotFound:
+        pass
+    try:
+        claims = sheet.add_worksheet(title=CLAIMS_SHEET, rows=1000, cols=len(CLAIM_COLUMNS))
+        claims.append_row(CLAIM_COLUMNS)
+        return claims
+    except gspread.exceptions.APIError:
+        # Another session created it first
+        return sheet.worksheet(CLAIMS_SHEET)
+
 def load_reviews():
     """Load all reviews from Google Sheets"""
+    import pandas as pd
+    
     try:
         worksheet = get_google_sheet()
         if worksheet is None:
-            return pd.DataFrame(columns=['timestamp', 'rating', 'review', 'ai_response', 'ai_summary', 'recommended_actions'])
+            return pd.DataFrame(columns=REVIEW_COLUMNS)
         
-        data = worksheet.get_all_records()
+        data = worksheet.get_all_records(numericise_ignore=['all'])
         
         if not data:
-            return pd.DataFrame(columns=['timestamp', 'rating', 'review', 'ai_response', 'ai_summary', 'recommended_actions'])
+            return pd.DataFrame(columns=REVIEW_COLUMNS)
         
         df = pd.DataFrame(data)
         
-        required_cols = ['timestamp', 'rating', 'review', 'ai_response', 'ai_summary', 'recommended_actions']
-        for col in required_cols:
+        for col in REVIEW_COLUMNS:
             if col not in df.columns:
                 df[col] = ''
         
+        df['review_id'] = df['review_id'].astype(str).str.strip()
+        # The frame is indexed by review_id, so ids must be unique
+        backfill_review_ids(worksheet, df)
+        review_locator.prime(df['review_id'].tolist())
+        df.index = pd.Index(df['review_id'].values)
+        
         if 'timestamp' in df.columns:
             df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
             df = df.dropna(subset=['timestamp'])
@@ -68,47 +222,237 @@ def load_reviews():
         
     except Exception as e:
         st.error(f"❌ Error loading reviews: {str(e)}")
-        return pd.DataFrame(columns=['timestamp', 'rating', 'review', 'ai_response', 'ai_summary', 'recommended_actions'])
+        return pd.DataFrame(columns=REVIEW_COLUMNS)
+
+def build_review_row(rating, review):
+    """Build the sheet row for a new review"""
+    return [
+        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        int(rating),
+        str(review),
+        "",
+        "",
+        "",
+        new_review_id(),
+        0,
+        "",
+        ""
+    ]
 
 def save_review(rating, review):
     """Save new review to Google Sheets"""
+    return save_reviews([build_review_row(rating, review)])
+
+def save_reviews(rows):
+    """Append a batch of review rows to Google Sheets in a single call"""
     try:
         worksheet = get_google_sheet()
         if worksheet is None:
             st.error("❌ Cannot connect to Google Sheet")
             return False
         
-        new_row = [
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            int(rating),
-            str(review),
-            "",
-            "",
-            ""
-        ]
-        
-        worksheet.append_row(new_row)
+        worksheet.append_rows(rows)
         return True
         
     except Exception as e:
         st.error(f"❌ Save error: {str(e)}")
         return False
 
-def update_review_with_ai(row_index, ai_response, ai_summary, recommended_actions):
-    """Update a specific review row with AI-generated content"""
+def append_review_rows(rows):
+    """
+    UI-free variant of save_reviews for background writers: raises instead of
+    calling st.error, so failures are reported by the session that submitted.
+    """
+    open_worksheet().append_rows(rows)
+    return True
+
+def backfill_review_ids(worksheet, df):
+    """
+    Assign ids to rows saved before review ids existed, and fresh ids to rows
+    copied in the sheet (every copy after the first), in one batch write
+    """
+    from gspread.utils import rowcol_to_a1
+    
+    ids = df['review_id']
+    missing = df.index[ids == '']
+    copied = df.index[(ids != '') & ids.duplicated(keep='first')]
+    if len(missing) == 0 and len(copied) == 0:
+        return
+    
+    id_col = review_locator.column(worksheet, 'review_id')
+    updates = []
+    for position in missing.append(copied):
+        sheet_row = int(position) + 2
+        if df.at[position, 'review_id']:
+            review_id = new_review_id()
+        else:
+            review_id = legacy_review_id(sheet_row, df.at[position, 'timestamp'], df.at[position, 'review'])
+        df.at[position, 'review_id'] = review_id
+        updates.append({'range': rowcol_to_a1(sheet_row, id_col), 'values': [[review_id]]})
+    
+    worksheet.batch_update(updates)
+
+def _cell_ranges(worksheet, sheet_row, names):
+    from gspread.utils import rowcol_to_a1
+    
+    return [rowcol_to_a1(sheet_row, review_locator.column(worksheet, name)) for name in names]
+
+def _read_lease_state(worksheet, sheet_rows):
+    """Read review_id, ai_response, version and lease cells for many rows in one call"""
+    names = ['review_id', 'ai_response', 'version', 'lease_owner', 'lease_expires']
+    ranges = [r for sheet_row in sheet_rows for r in _cell_ranges(worksheet, sheet_row, names)]
+    values = worksheet.batch_get(ranges)
+    
+    cells = [str(v[0][0]) if v and v[0] else '' for v in values]
+    states = []
+    for i in range(len(sheet_rows)):
+        review_id, ai_response, version, owner, expires = cells[i * 5:(i + 1) * 5]
+        states.append({
+            'review_id': review_id.strip(),
+            'ai_response': ai_response.strip(),
+            'version': int(float(version)) if version.strip() else 0,
+            'lease_owner': owner.strip(),
+            'lease_expires': float(expires) if expires.strip() else 0.0
+        })
+    return states
+
+def _locate_rows(worksheet, review_ids):
+    """
+    Return (review_id, sheet_row, state) for the ids found in the sheet. The
+    review_id cell is read with the rest of the row state, so a cached row that
+    no longer holds its review (rows deleted or re-sorted) triggers a rescan.
+    """
+    for attempt in range(2):
+        located = [(rid, review_locator.locate(worksheet, rid)) for rid in review_ids]
+        located = [(rid, row) for rid, row in located if row is not None]
+        if not located:
+            return []
+        
+        states = _read_lease_state(worksheet, [row for _, row in located])
+        rows = [(rid, row, state) for (rid, row), state in zip(located, states)]
+        if attempt == 0 and any(state['review_id'] != rid for rid, _, state in rows):
+            review_locator.invalidate()
+            continue
+        return [(rid, row, state) for rid, row, state in rows if state['review_id'] == rid]
+
+def _mirror_leases(worksheet, rows, owner, expires):
+    """Copy lease holders into the review rows so they are visible in the sheet"""
+    from gspread.utils import rowcol_to_a1
+    
+    owner_col = review_locator.column(worksheet, 'lease_owner')
+    expires_col = review_locator.column(worksheet, 'lease_expires')
+    worksheet.batch_update([
+        {'range': f"{rowcol_to_a1(row, owner_col)}:{rowcol_to_a1(row, expires_col)}", 'values': [[owner, expires]]}
+        for row in rows
+    ])
+
+def open_review_sheets():
+    """(reviews worksheet, claims worksheet), opened once and passed to the lease helpers"""
+    worksheet = open_worksheet()
+    return worksheet, get_claims_sheet(worksheet)
+
+def claim_reviews(review_ids, owner, lease_seconds=LEASE_SECONDS, sheets=None):
+    """
+    Take expiring leases on pending reviews so parallel workers never process
+    the same row. Claims are appended to the claims worksheet and replayed in
+    append order, so when two workers claim a review at once exactly one of
+    them wins. Returns {review_id: version} for the reviews this owner won.
+    Sheets errors are raised rather than reported, so callers can tell them
+    apart from claims lost to another worker.
+    """
+    worksheet, claims = sheets or open_review_sheets()
+    claim_log.refresh(claims)
+    now = time.time()
+    candidates = [
+        (rid, row, state) for rid, row, state in _locate_rows(worksheet, review_ids)
+        if not state['ai_response'] and claim_log.holder(rid, now) in (None, owner)
+    ]
+    if not candidates:
+        return {}
+    
+    expires = int(now + lease_seconds)
+    claims.append_rows(
+        [[rid, owner, now, expires, 'claim'] for rid, _, _ in candidates],
+        value_input_option='RAW'
+    )
+    claim_log.refresh(claims)
+    won = [(rid, row, state) for rid, row, state in candidates if claim_log.holder(rid, now) == owner]
+    if won:
+        _mirror_leases(worksheet, [row for _, row, _ in won], owner, str(expires))
+    return {rid: state['version'] for rid, _, state in won}
+
+def release_reviews(review_ids, owner, sheets=None):
+    """Drop this owner's leases so other workers can pick the reviews up"""
     try:
-        worksheet = get_google_sheet()
-        if worksheet is None:
+        worksheet, claims = sheets or open_review_sheets()
+        claim_log.refresh(claims)
+        held = [(rid, row) for rid, row, _ in _locate_rows(worksheet, review_ids) if claim_log.holder(rid) == owner]
+        if not held:
+            return
+        
+        claims.append_rows(
+            [[rid, owner, time.time(), 0, 'release'] for rid, _ in held],
+            value_input_option='RAW'
+        )
+        _mirror_leases(worksheet, [row for _, row in held], '', '')
+    
+    except Exception as e:
+        st.error(f"❌ Release error: {str(e)}")
+
+def update_review_with_ai(review_id, ai_response, ai_summary, recommended_actions, owner=None, expected_version=None,
+                          sheets=None):
+    """
+    Update a review, located by its id, with AI-generated content.
+    With an owner, the write only happens while the owner still holds the
+    lease and the version is unchanged; it bumps the version and clears the
+    lease. Raises ReviewConflictError when another worker got there first.
+    The check and the write are separate calls: the claim log makes the lease
+    holder unique, and the version check catches writers that bypass leases,
+    but a lease that expires between the check and the write is not detected.
+    Pass `sheets` from open_review_sheets to reuse handles across a batch.
+    """
+    from gspread.utils import rowcol_to_a1
+    
+    try:
+        if sheets is not None:
+            worksheet, claims = sheets
+        else:
+            worksheet = get_google_sheet()
+            if worksheet is None:
+                return False
+            claims = None
+        
+        located = _locate_rows(worksheet, [review_id])
+        if not located:
+            st.error(f"❌ Review {review_id} not found")
             return False
-        
-        sheet_row = row_index + 2
-        
-        worksheet.update_cell(sheet_row, 4, str(ai_response))
-        worksheet.update_cell(sheet_row, 5, str(ai_summary))
-        worksheet.update_cell(sheet_row, 6, str(recommended_actions))
-        
+        _, sheet_row, state = located[0]
+        
+        ai_start = rowcol_to_a1(sheet_row, review_locator.column(worksheet, 'ai_response'))
+        ai_end = rowcol_to_a1(sheet_row, review_locator.column(worksheet, 'recommended_actions'))
+        updates = [{
+            'range': f"{ai_start}:{ai_end}",
+            'values': [[str(ai_response), str(ai_summary), str(recommended_actions)]]
+        }]
+        
+        if owner is not None:
+            claim_log.refresh(claims or get_claims_sheet(worksheet))
+            if claim_log.holder(review_id) != owner or state['ai_response']:
+                raise ReviewConflictError(f"Review {review_id} is leased to another worker")
+            if expected_version is not None and state['version'] != expected_version:
+                raise ReviewConflictError(f"Review {review_id} changed (version {state['version']})")
+            
+            version_cell, owner_cell, expires_cell = _cell_ranges(
+                worksheet, sheet_row, ['version', 'lease_owner', 'lease_expires']
+            )
+            updates.append({'range': version_cell, 'values': [[state['version'] + 1]]})
+            updates.append({'range': f"{owner_cell}:{expires_cell}", 'values': [['', '']]})
+        
+        worksheet.batch_update(updates)
         return True
-        
+    
+    except ReviewConflictError:
+        raise
     except Exception as e:
         st.error(f"❌ Update error: {str(e)}")
         return False
@@ -116,10 +460,14 @@ def update_review_with_ai(row_index, ai_response, ai_summary, recommended_action
 def configure_gemini_api(api_key):
     """Configure and test Gemini API connection"""
     try:
+        import google.generativeai as genai
+        
         genai.configure(api_key=api_key)
         model = genai.GenerativeModel('gemini-2.5-flash-lite')
         
-        response = model.generate_content("Say OK")
+        from metering import metered_generate
+        
+        response = metered_generate(model, "Say OK", task='connect')
         if response.text:
             return model
         return None
@@ -128,40 +476,38 @@ def configure_gemini_api(api_key):
         st.error(f"❌ Gemini API Error: {str(e)}")
         return None
 
-def generate_all_ai_content(model, rating, review):
+def fallback_ai_content(rating):
+    """Template AI content used when Gemini is unavailable or over budget"""
+    if rating <= 2:
+        return {
+            'ai_response': "We sincerely apologize for your experience. Your feedback is invaluable and we're committed to making this right. Our team will reach out to you shortly.",
+            'ai_summary': f"{rating}★ - Customer reported negative experience",
+            'recommended_actions': "1. Contact customer immediately to apologize and understand issue\n2. Investigate root cause of the problem\n3. Implement corrective measures to prevent recurrence"
+        }
+    elif rating == 3:
+        return {
+            'ai_response': "Thank you for your feedback. We appreciate you taking the time to share your experience. We're always working to improve and your input helps us do that.",
+            'ai_summary': f"{rating}★ - Mixed feedback with room for improvement",
+            'recommended_actions': "1. Follow up with customer to understand specific concerns\n2. Review internal processes related to feedback\n3. Monitor similar feedback patterns"
+        }
+    else:
+        return {
+            'ai_response': f"Thank you so much for the wonderful {rating}-star review! We're thrilled that you had a great experience with us. We look forward to serving you again!",
+            'ai_summary': f"{rating}★ - Highly satisfied customer",
+            'recommended_actions': "1. Thank the customer personally if possible\n2. Share positive feedback with the team\n3. Request permission to use as testimonial"
+        }
+
+def generate_all_ai_content(model, rating, review, run_id=None, daily_budget=None, run_budget=None):
     """Generate AI response, summary, and recommended actions"""
+    from metering import usage_meter
+    from prompts import generate_for_task
+    
     try:
-        user_prompt = f"""You are a professional customer service representative. Write a brief, empathetic response (2-3 sentences) to this customer review:
-
-Rating: {rating}/5 stars
-Review: {review}
-
-Generate a professional response that:
-- Thanks the customer for their feedback
-- Addresses their sentiment appropriately
-- Is warm and genuine
-
-Response:"""
-        
-        user_response = model.generate_content(user_prompt).text.strip()
-        
-        summary_prompt = f"""Summarize this review in ONE concise sentence (maximum 12 words):
-
-Rating: {rating}/5
-Review: {review}
-
-Summary:"""
-        
-        summary = model.generate_content(summary_prompt).text.strip()
-        
-        actions_prompt = f"""Based on this customer feedback, suggest 3 specific, actionable steps the business should take. Format as a numbered list.
-
-Rating: {rating}/5 stars
-Review: {review}
-
-Provide 3 concrete action items:"""
+        usage_meter.check_budget(run_id, daily_budget, run_budget)
         
-        actions = model.generate_content(actions_prompt).text.strip()
+        user_response = generate_for_task(model, 'response', rating, review, run_id=run_id).text.strip()
+        summary = generate_for_task(model, 'summary', rating, review, run_id=run_id).text.strip()
+        actions = generate_for_task(model, 'actions', rating, review, run_id=run_id).text.strip()
         
         return {
             'ai_response': user_response,
@@ -171,61 +517,50 @@ Provide 3 concrete action items:"""
         
     except Exception as e:
         st.warning(f"⚠️ AI generation failed: {str(e)}")
-        
-        if rating <= 2:
-            return {
-                'ai_response': "We sincerely apologize for your experience. Your feedback is invaluable and we're committed to making this right. Our team will reach out to you shortly.",
-                'ai_summary': f"{rating}★ - Customer reported negative experience",
-                'recommended_actions': "1. Contact customer immediately to apologize and understand issue\n2. Investigate root cause of the problem\n3. Implement corrective measures to prevent recurrence"
-            }
-        elif rating == 3:
-            return {
-                'ai_response': "Thank you for your feedback. We appreciate you taking the time to share your experience. We're always working to improve and your input helps us do that.",
-                'ai_summary': f"{rating}★ - Mixed feedback with room for improvement",
-                'recommended_actions': "1. Follow up with customer to understand specific concerns\n2. Review internal processes related to feedback\n3. Monitor similar feedback patterns"
-            }
-        else:
-            return {
-                'ai_response': f"Thank you so much for the wonderful {rating}-star review! We're thrilled that you had a great experience with us. We look forward to serving you again!",
-                'ai_summary': f"{rating}★ - Highly satisfied customer",
-                'recommended_actions': "1. Thank the customer personally if possible\n2. Share positive feedback with the team\n3. Request permission to use as testimonial"
-            }
+        return fallback_ai_content(rating)
+
+RATING_COLORS = {
+    1: "#D32F2F",
+    2: "#F57C00",
+    3: "#FBC02D",
+    4: "#7CB342",
+    5: "#388E3C"
+}
+
+RATING_EMOJIS = {
+    1: "😞",
+    2: "😕",
+    3: "😐",
+    4: "😊",
+    5: "🤩"
+}
+
+RATING_TEXTS = {
+    1: "Very Dissatisfied",
+    2: "Dissatisfied",
+    3: "Neutral",
+    4: "Satisfied",
+    5: "Very Satisfied"
+}
+
+NEW_REVIEW_SECONDS = 300
 
 def get_sentiment_color(rating):
     """Return color based on rating sentiment"""
-    colors = {
-        1: "#D32F2F",
-        2: "#F57C00",
-        3: "#FBC02D",
-        4: "#7CB342",
-        5: "#388E3C"
-    }
-    return colors.get(rating, "#757575")
+    return RATING_COLORS.get(rating, "#757575")
 
 def get_rating_emoji(rating):
     """Return emoji based on rating"""
-    emojis = {
-        1: "😞",
-        2: "😕",
-        3: "😐",
-        4: "😊",
-        5: "🤩"
-    }
-    return emojis.get(rating, "⭐")
+    return RATING_EMOJIS.get(rating, "⭐")
 
 def get_rating_text(rating):
     """Return text description based on rating"""
-    texts = {
-        1: "Very Dissatisfied",
-        2: "Dissatisfied",
-        3: "Neutral",
-        4: "Satisfied",
-        5: "Very Satisfied"
-    }
-    return texts.get(rating, "Unknown")
+    return RATING_TEXTS.get(rating, "Unknown")
 
 def time_ago(timestamp):
     """Calculate and return human-readable time difference"""
+    import pandas as pd
+    
     try:
         now = datetime.now()
         diff = now - pd.to_datetime(timestamp)
@@ -257,6 +592,8 @@ def check_if_ai_processed(row):
 
 def safe_get_value(row, key, default=''):
     """Safely get value from row with fallback"""
+    import pandas as pd
+    
     try:
         if key not in row:
             return default
@@ -266,3 +603,57 @@ def safe_get_value(row, key, default=''):
         return str(value).strip()
     except:
         return default
+
+def clean_text_column(df, key, default=''):
+    """Vectorized safe_get_value for a whole column"""
+    import pandas as pd
+    
+    if key not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    values = df[key].fillna('').astype(str).str.strip()
+    if default:
+        values = values.mask(values == '', default)
+    return values
+
+def time_ago_column(timestamps, now):
+    """Vectorized time_ago against a single reference time"""
+    import pandas as pd
+    
+    seconds = (pd.Timestamp(now) - pd.to_datetime(timestamps, errors='coerce')).dt.total_seconds()
+    whole = seconds.fillna(0).clip(lower=0)
+    mins = (whole // 60).astype(int).astype(str) + "m ago"
+    hours = (whole // 3600).astype(int).astype(str) + "h ago"
+    days = (whole // 86400).astype(int).astype(str) + "d ago"
+    
+    labels = days.where(seconds >= 86400, hours)
+    labels = labels.where(seconds >= 3600, mins)
+    labels = labels.where(seconds >= 60, "Just now")
+    return labels.where(seconds.notna(), "Unknown"), seconds
+
+def prepare_review_cards(df, now=None):
+    """
+    Compute everything the review cards display in one columnar pass,
+    so the render loop only does string formatting.
+    """
+    import pandas as pd
+    
+    now = now or datetime.now()
+    prep = pd.DataFrame(index=df.index)
+    
+    prep['rating'] = pd.to_numeric(df['rating'], errors='coerce').fillna(3).astype(int)
+    prep['review_text'] = clean_text_column(df, 'review', 'No review text')
+    prep['ai_response'] = clean_text_column(df, 'ai_response')
+    
+    actions = clean_text_column(df, 'recommendation_actions')
+    prep['ai_actions'] = actions.mask(actions == '', clean_text_column(df, 'recommended_actions'))
+    
+    prep['emoji'] = prep['rating'].map(RATING_EMOJIS).fillna("⭐")
+    prep['color'] = prep['rating'].map(RATING_COLORS).fillna("#757575")
+    prep['label'] = prep['rating'].map(RATING_TEXTS).fillna("Unknown")
+    prep['has_ai'] = prep['ai_response'] != ''
+    
+    prep['time_ago'], age_seconds = time_ago_column(df['timestamp'], now)
+    prep['is_new'] = (age_seconds < NEW_REVIEW_SECONDS).fillna(False)
+    
+    prep['idx'] = df.index
+    return prep.to_dict('records')